@@ -1,23 +1,113 @@
-from flask import Flask, render_template, request, jsonify
-import requests
-from bs4 import BeautifulSoup
+from flask import Flask, Response, g, render_template, request, jsonify
 import json
+import os
 import pickle
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import re
 import random
-from difflib import SequenceMatcher
-import Levenshtein
+import threading
+import time
+from spelling import SpellingCorrector
+from keyword_scorer import KeywordIntentScorer
+from page_cache import PageContentCache
+from response_cache import ResponseCache
+from circuit_breaker import STATES as CIRCUIT_STATES
+from deadline import Deadline
+from similarity import build_index
+from training import (MODEL_FILE, VECTORIZER_MODES, TrainingConflict, TrainingRunner, build_model, save_model,
+                      training_lock, vectorizer_mode)
+from model_store import ModelFormatError, load_model_file
+from logging_config import configure_logging, get_logger
+from metrics import (ANSWERS, CONTENT_TYPE, QUERIES_TRUNCATED, REGISTRY, REQUEST_SECONDS, STAGE_SECONDS,
+                     STAGES_SKIPPED, TIME_TO_FIRST_TOKEN)
 
 app = Flask(__name__)
 
+# Site the chatbot answers about and /train scrapes; point it at a local
+# stub to run offline (see benchmarks/stub_site.py)
+WEBSITE_URL = os.environ.get('CHATBOT_WEBSITE_URL', "https://www.brainovision.in")
+
+WELCOME_MESSAGE = "Welcome to Brainovision Solutions! 🎓 I'm your smart AI assistant. I can understand your questions even with small spelling mistakes. Ask me about courses, internships, or anything else!"
+MAX_BATCH_SIZE = 1000
+
+# With a socket path set, chat messages are answered by scoring_daemon.py
+# instead of a model loaded in this process
+SCORING_SOCKET = os.environ.get('CHATBOT_SCORING_SOCKET')
+
+# Words per event sent by /api/chat/stream
+STREAM_CHUNK_WORDS = 8
+
+# Seconds a chat request (budget) or a whole batch (batch_budget) may spend
+# matching. Spelling correction is skipped once the budget is spent, keyword
+# matching once less than tfidf_reserve is left, and TF-IDF once nothing is;
+# skipped messages fall through to the context fallback. Only the first
+# max_tokens words of a message are matched.
+DEADLINE_SETTINGS = {'budget': 0.25, 'batch_budget': 2.0, 'tfidf_reserve': 0.02, 'max_tokens': 64}
+
+# How TF-IDF matches are searched: 'patterns' scores every training pattern;
+# 'centroids' and 'medoids' shortlist candidate_tags tags first and only
+# score their patterns (see benchmarks/bench_tag_index.py to pick a setting)
+INDEX_SETTINGS = {'mode': 'patterns', 'candidate_tags': 3, 'medoids_per_tag': 3}
+
+# Vectorizer used by /train (see training.VECTORIZER_MODES), and the lowest
+# similarity that counts as a match for each: character n-grams overlap more
+# between unrelated texts, so they need a higher bar
+VECTORIZER_MODE = 'word'
+MATCH_THRESHOLDS = {'word': 0.15, 'char': 0.4}
+
+# 'DEBUG' logs every step of every chat turn; json_logs with a sample_rate
+# below 1 keeps a fraction of them as structured JSON lines
+LOG_SETTINGS = {'level': 'INFO', 'json_logs': False, 'sample_rate': 1.0}
+configure_logging(**LOG_SETTINGS)
+logger = get_logger('app')
+
+def model_file_id():
+    """(inode, mtime, size) of the model file, which changes whenever /train replaces it; None if missing"""
+    try:
+        stat = os.stat(MODEL_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _chunk_words(text):
+    """Split a reply into STREAM_CHUNK_WORDS-word pieces that join back exactly"""
+    # Whitespace stays with the word before it
+    words = re.findall(r'\s*\S+\s*', text) or [text]
+    return [''.join(words[i:i + STREAM_CHUNK_WORDS]) for i in range(0, len(words), STREAM_CHUNK_WORDS)]
+
+class QueryAnalysis:
+    """Per-request view of a chat message shared by every pipeline stage"""
+    def __init__(self, text, corrected_text, intent, truncated=False, skipped=()):
+        self.text = text
+        self.tokens = text.split()
+        self.corrected_text = corrected_text
+        self.corrected_tokens = corrected_text.split()
+        self.intent = intent
+        # How the deadline shaped this message: cut to max_tokens words, and
+        # the stages left out; degraded matches are never cached
+        self.truncated = truncated
+        self.skipped = list(skipped)
+        self.cached = False
+        
+        # Exactly what the keyword and TF-IDF stages read; both depend on word
+        # order, so reordered messages must not share a cached match
+        self.cache_key = ' '.join(self.corrected_tokens)
+
 class SmartChatbot:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+    def __init__(self, page_cache=None, model_data=None, response_cache=None, index_settings=None):
         self.model_data = None
-        self.website_url = "https://www.brainovision.in"
+        # Identity of the model file this chatbot loaded, if it loaded one
+        self.model_file_id = None
+        self.website_url = WEBSITE_URL
+        
+        # Website pages are fetched in the background, never inside a chat request
+        if page_cache is None:
+            page_cache = PageContentCache(self.website_url, ['/internship', '/courses'],
+                                          watch_terms=['internship'])
+        self.page_cache = page_cache
+        
+        # Matches are only valid for the model that produced them, so every
+        # chatbot (and therefore every swapped-in model) starts with its own cache
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
         
         # Common misspellings and their corrections
         self.common_misspellings = {
@@ -38,6 +128,7 @@ class SmartChatbot:
             'admission': ['admission', 'admission', 'admision', 'admisson'],
             'contact': ['contact', 'contct', 'contat', 'conatct']
         }
+        self.spelling_corrector = SpellingCorrector(self.common_misspellings)
         
         # Keywords for intent detection
         self.keyword_groups = {
@@ -50,98 +141,89 @@ class SmartChatbot:
             'contact': ['contact', 'phone', 'email', 'address', 'location', 'reach'],
             'about': ['about', 'company', 'brainovision', 'who are you', 'what is']
         }
+        self.keyword_scorer = KeywordIntentScorer(self.keyword_groups)
+        
+        if model_data is not None:
+            self.model_data = model_data
+        else:
+            self.load_model()
         
-        self.load_model()
+        # Built once per model so each query only visits its own terms
+        self.index_settings = index_settings if index_settings is not None else INDEX_SETTINGS
+        self.pattern_index = None
+        self.vectorizer_mode = 'word'
+        if self.model_data:
+            # Character n-gram models match typos themselves, so queries skip correction
+            self.vectorizer_mode = vectorizer_mode(self.model_data['vectorizer'])
+            self.pattern_index = build_index(self.model_data['tfidf_matrix'], self.model_data['tags'],
+                                             term_patterns=self.model_data.get('term_patterns'),
+                                             **self.index_settings)
     
     def load_model(self):
         """Load the trained model"""
         try:
-            with open('website_training_data.pkl', 'rb') as f:
-                self.model_data = pickle.load(f)
-            print("✅ Smart chatbot model loaded!")
-        except:
-            print("⚠️  Model not found. Please train the chatbot first.")
+            self.model_file_id = model_file_id()
+            self.model_data = load_model_file(MODEL_FILE)
+            logger.info("✅ Smart chatbot model loaded!")
+        except FileNotFoundError:
+            self.model_data = self._load_legacy_model()
+        except ModelFormatError as e:
+            logger.warning("⚠️  Model file is not usable (%s). Please train the chatbot again.", e)
             self.model_data = None
     
+    def _load_legacy_model(self):
+        """Load a model pickled by older versions until /train writes the new format"""
+        try:
+            with open('website_training_data.pkl', 'rb') as f:
+                model_data = pickle.load(f)
+            logger.info("✅ Smart chatbot model loaded (legacy pickle, retrain to upgrade)!")
+            return model_data
+        except (OSError, pickle.UnpicklingError, EOFError):
+            logger.warning("⚠️  Model not found. Please train the chatbot first.")
+            return None
+    
     def correct_spelling(self, text):
         """Correct common spelling mistakes in the text"""
-        words = text.lower().split()
-        corrected_words = []
-        
-        for word in words:
-            # Remove special characters
-            clean_word = re.sub(r'[^\w\s]', '', word)
-            
-            if len(clean_word) < 3:  # Skip very short words
-                corrected_words.append(word)
-                continue
-            
-            # Check against common misspellings
-            best_match = clean_word
-            highest_similarity = 0
-            
-            for correct_word, variations in self.common_misspellings.items():
-                for variation in variations + [correct_word]:
-                    similarity = SequenceMatcher(None, clean_word, variation).ratio()
-                    if similarity > highest_similarity and similarity > 0.7:  # 70% similarity threshold
-                        highest_similarity = similarity
-                        best_match = correct_word
-            
-            # Use Levenshtein distance as fallback
-            if highest_similarity < 0.8:
-                for correct_word in self.common_misspellings.keys():
-                    distance = Levenshtein.distance(clean_word, correct_word)
-                    if distance <= 2 and len(clean_word) >= 4:  # Allow 2 character differences
-                        best_match = correct_word
-                        break
-            
-            corrected_words.append(best_match)
-        
-        corrected_text = ' '.join(corrected_words)
-        print(f"🔤 Spelling correction: '{text}' -> '{corrected_text}'")
+        corrected_text = self.spelling_corrector.correct(text)
+        logger.debug("🔤 Spelling correction: '%s' -> '%s'", text, corrected_text)
         return corrected_text
     
     def detect_intent_from_keywords(self, text):
         """Detect intent based on keyword matching with fuzzy matching"""
-        text_lower = text.lower()
-        intent_scores = {}
-        
-        for intent, keywords in self.keyword_groups.items():
-            score = 0
-            for keyword in keywords:
-                # Exact match
-                if keyword in text_lower:
-                    score += 2
-                # Fuzzy match for individual words
-                else:
-                    words_in_text = text_lower.split()
-                    for word in words_in_text:
-                        if len(word) > 3:  # Only check words longer than 3 characters
-                            for kw in keyword.split():
-                                similarity = SequenceMatcher(None, word, kw).ratio()
-                                if similarity > 0.8:
-                                    score += 1
-                                    break
-            
-            if score > 0:
-                intent_scores[intent] = score
-        
-        if intent_scores:
-            best_intent = max(intent_scores.items(), key=lambda x: x[1])
-            print(f"🎯 Detected intent: {best_intent[0]} (score: {best_intent[1]})")
-            return best_intent[0]
-        
-        return None
+        intent, score = self.keyword_scorer.detect(text)
+        if intent:
+            logger.debug("🎯 Detected intent: %s (score: %s)", intent, score,
+                         extra={'intent': intent, 'score': score})
+        return intent
     
-    def get_website_answer(self, question):
-        """Get specific answers from the website based on corrected intent"""
-        # First correct spelling
-        corrected_question = self.correct_spelling(question)
-        print(f"🔍 Original: '{question}' -> Corrected: '{corrected_question}'")
-        
-        # Detect intent from corrected question
-        intent = self.detect_intent_from_keywords(corrected_question)
+    def analyze_query(self, user_input, detect_intent=True, deadline=None):
+        """Normalize, correct and score a message once for the whole pipeline"""
+        text = user_input.lower().strip()
+        tokens = text.split()
+        truncated = len(tokens) > DEADLINE_SETTINGS['max_tokens']
+        if truncated:
+            text = ' '.join(tokens[:DEADLINE_SETTINGS['max_tokens']])
+            QUERIES_TRUNCATED.inc()
         
+        skipped = []
+        corrected_text = text
+        if self.vectorizer_mode == 'word':
+            if deadline is not None and deadline.expired():
+                skipped.append('spelling')
+                STAGES_SKIPPED.inc('spelling')
+            else:
+                corrected_text = self.correct_spelling(text)
+        intent = self.detect_intent_from_keywords(corrected_text) if detect_intent else None
+        return QueryAnalysis(text, corrected_text, intent, truncated, skipped)
+
+    def get_website_answer(self, question, analysis=None):
+        """Get specific answers from the website based on corrected intent"""
+        if analysis is None:
+            analysis = self.analyze_query(question)
+        logger.debug("🔍 Original: '%s' -> Corrected: '%s'", analysis.text, analysis.corrected_text)
+
+        intent = analysis.intent
+
         try:
             if intent == 'internship':
                 return self._scrape_internship_info()
@@ -163,50 +245,39 @@ class SmartChatbot:
                 return None
                 
         except Exception as e:
-            print(f"Error getting website answer: {e}")
+            logger.exception("Error getting website answer: %s", e)
             return None
     
     def _scrape_internship_info(self):
         """Scrape internship information"""
-        try:
-            # Try to scrape actual internship page
-            response = requests.get(f"{self.website_url}/internship", timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                # Extract internship-specific content
-                internship_text = soup.get_text().lower()
-                if 'internship' in internship_text:
-                    return f"💼 **Internship Program at Brainovision:**\n\nBased on our website, we offer comprehensive internship programs. Please visit {self.website_url}/internship for detailed information about:\n• Duration and structure\n• Stipend details\n• Project opportunities\n• Application process"
-            
-            # Fallback to general internship info
-            return f"💼 **Internship Program:**\n\nAt Brainovision Solutions, we provide:\n\n✅ **3-Month Paid Internship**\n• Hands-on industry projects\n• Professional mentorship\n• Monthly stipend\n• Certificate of completion\n• Placement assistance\n\n🎯 **All our courses include internship opportunities**\n\n📋 **Learn more:** {self.website_url}"
-                
-        except:
+        # Read the background-refreshed copy of the internship page
+        page = self.page_cache.get(f"{self.website_url}/internship")
+        if page is None:
             return f"💼 **Internship Opportunities:**\n\nWe offer comprehensive internship programs with:\n• Real-world project experience\n• Industry expert guidance\n• Financial support through stipend\n• Career development opportunities\n\n🌐 **Details at:** {self.website_url}"
+        
+        if page.status_code == 200 and 'internship' in page.mentions:
+            return f"💼 **Internship Program at Brainovision:**\n\nBased on our website, we offer comprehensive internship programs. Please visit {self.website_url}/internship for detailed information about:\n• Duration and structure\n• Stipend details\n• Project opportunities\n• Application process"
+        
+        # Fallback to general internship info
+        return f"💼 **Internship Program:**\n\nAt Brainovision Solutions, we provide:\n\n✅ **3-Month Paid Internship**\n• Hands-on industry projects\n• Professional mentorship\n• Monthly stipend\n• Certificate of completion\n• Placement assistance\n\n🎯 **All our courses include internship opportunities**\n\n📋 **Learn more:** {self.website_url}"
     
     def _scrape_courses_page(self):
         """Scrape courses page for current information"""
-        try:
-            response = requests.get(f"{self.website_url}/courses", timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract course information
-            courses_info = []
-            headings = soup.find_all(['h1', 'h2', 'h3', 'h4'])
-            
-            for heading in headings[:8]:
-                text = heading.get_text().strip()
-                if text and len(text) > 3 and len(text) < 100:
-                    courses_info.append(text)
-            
-            if courses_info:
-                course_list = "\n".join([f"• {course}" for course in courses_info[:6]])
-                return f"🎯 **Courses at Brainovision:**\n\n{course_list}\n\n📚 **Complete course details:** {self.website_url}/courses"
-            else:
-                return f"📚 **Our Course Catalog:**\n\nWe offer industry-relevant programs including:\n• Python Full Stack Development\n• Java Full Stack\n• Artificial Intelligence & ML\n• Data Science & Analytics\n• Cloud Computing\n• DevOps\n\n🔗 **Explore all courses:** {self.website_url}/courses"
-                
-        except:
+        page = self.page_cache.get(f"{self.website_url}/courses")
+        if page is None:
             return f"📚 **Technical Courses:**\n\nBrainovision Solutions offers cutting-edge technology programs designed for career success.\n\n🌐 **Visit our courses page:** {self.website_url}/courses"
+        
+        # Extract course information
+        courses_info = []
+        for text in page.headings[:8]:
+            if text and len(text) > 3 and len(text) < 100:
+                courses_info.append(text)
+        
+        if courses_info:
+            course_list = "\n".join([f"• {course}" for course in courses_info[:6]])
+            return f"🎯 **Courses at Brainovision:**\n\n{course_list}\n\n📚 **Complete course details:** {self.website_url}/courses"
+        else:
+            return f"📚 **Our Course Catalog:**\n\nWe offer industry-relevant programs including:\n• Python Full Stack Development\n• Java Full Stack\n• Artificial Intelligence & ML\n• Data Science & Analytics\n• Cloud Computing\n• DevOps\n\n🔗 **Explore all courses:** {self.website_url}/courses"
     
     def _scrape_python_info(self):
         return f"🐍 **Python Full Stack Development:**\n\nComprehensive training in:\n• Python Programming\n• Django & Flask Frameworks\n• Frontend Technologies\n• Database Management\n• REST APIs & Deployment\n\n💼 Includes 3-month internship\n💰 Stipend provided\n\n📖 **Details:** {self.website_url}/courses"
@@ -228,42 +299,142 @@ class SmartChatbot:
     
     def get_response(self, user_input):
         """Get intelligent response with spelling correction"""
-        user_input = user_input.lower().strip()
+        return self.get_responses([user_input])[0]
+    
+    def get_responses(self, user_inputs, deadline=None):
+        """Answer a list of messages, scoring every uncached one in a single TF-IDF pass"""
+        return [answer for answer, _ in self.respond(user_inputs, deadline)]
+    
+    def respond(self, user_inputs, deadline=None):
+        """(answer, meta) for every message; meta says which stage answered and what the deadline skipped"""
+        analyses, matches = self.match_queries(user_inputs, deadline)
+        replies = []
+        for user_input, analysis, match in zip(user_inputs, analyses, matches):
+            start = time.perf_counter()
+            answered_by, answer = self._answer_match(user_input, analysis, match)
+            STAGE_SECONDS.observe(time.perf_counter() - start, 'answer')
+            replies.append((answer, _answer_meta(answered_by, match[1], analysis)))
+        return replies
+    
+    def stream_response(self, user_input, deadline=None):
+        """Yield ('intent', match) as soon as the message is matched, the reply as ('chunk', text) pieces, then ('meta', meta)"""
+        analyses, matches = self.match_queries([user_input], deadline)
+        stage, value = matches[0]
+        yield 'intent', {'stage': stage, 'intent': value}
         
-        print(f"👤 Original input: '{user_input}'")
+        start = time.perf_counter()
+        answered_by, answer = self._answer_match(user_input, analyses[0], matches[0])
+        STAGE_SECONDS.observe(time.perf_counter() - start, 'answer')
+        for chunk in _chunk_words(answer):
+            yield 'chunk', chunk
+        yield 'meta', _answer_meta(answered_by, value, analyses[0])
+    
+    def match_queries(self, user_inputs, deadline=None):
+        """Analyze messages and decide which stage answers each; returns (analyses, matches)"""
+        if deadline is None:
+            deadline = Deadline()
+        clock = time.perf_counter
+        analyses = []
+        matches = []
+        for user_input in user_inputs:
+            start = clock()
+            analysis = self.analyze_query(user_input, detect_intent=False, deadline=deadline)
+            logger.debug("👤 Original input: '%s'", analysis.text)
+            analyses.append(analysis)
+            looked_up = clock()
+            
+            # Rephrasings of a known question skip keyword and TF-IDF matching.
+            # Only the match is cached, so responses are still picked at random.
+            match = self.response_cache.get(analysis.cache_key)
+            analysis.cached = match is not None
+            matches.append(match)
+            STAGE_SECONDS.observe(looked_up - start, 'spelling')
+            STAGE_SECONDS.observe(clock() - looked_up, 'response_cache')
+        
+        misses = [i for i, match in enumerate(matches) if match is None]
+        for i in misses:
+            # Leave what is left of the budget to the single TF-IDF pass
+            if deadline.remaining() <= DEADLINE_SETTINGS['tfidf_reserve']:
+                _skip_stage(analyses[i], 'keywords')
+                continue
+            start = clock()
+            analyses[i].intent = self.detect_intent_from_keywords(analyses[i].corrected_text)
+            STAGE_SECONDS.observe(clock() - start, 'keywords')
+        
+        # Website intents are answered from the site; the rest go to the AI model together
+        unmatched = [i for i in misses if not analyses[i].intent]
+        if unmatched and deadline.expired():
+            for i in unmatched:
+                _skip_stage(analyses[i], 'tfidf')
+            predicted_tags = []
+        elif unmatched:
+            start = clock()
+            predicted_tags = self._match_model_tags([analyses[i] for i in unmatched])
+            STAGE_SECONDS.observe(clock() - start, 'tfidf')
+        else:
+            predicted_tags = []
+        tags_by_index = dict(zip(unmatched, predicted_tags))
         
+        for i in misses:
+            matches[i] = self._match_query(analyses[i], tags_by_index.get(i))
+            # A full match later on must not be shadowed by a degraded one
+            if not analyses[i].skipped:
+                self.response_cache.put(analyses[i].cache_key, matches[i])
+        return analyses, matches
+    
+    def _match_query(self, analysis, predicted_tag=None):
+        """Decide which stage answers the query: ('website', intent), ('model', tag) or ('fallback', None)"""
         # First, try to get specific answer from website with spelling correction
-        website_answer = self.get_website_answer(user_input)
-        if website_answer:
-            return website_answer
+        if analysis.intent:
+            return ('website', analysis.intent)
         
         # Then use AI model with corrected text
-        if self.model_data:
-            try:
-                corrected_input = self.correct_spelling(user_input)
-                user_vec = self.model_data['vectorizer'].transform([corrected_input])
-                similarities = cosine_similarity(user_vec, self.model_data['tfidf_matrix'])
-                best_match_idx = np.argmax(similarities)
-                best_score = similarities[0, best_match_idx]
-                
-                print(f"🎯 AI Model score: {best_score:.3f}")
-                
-                if best_score > 0.15:  # Lower threshold for better matching
-                    predicted_tag = self.model_data['tags'][best_match_idx]
-                    response = random.choice(self.model_data['responses'][predicted_tag])
-                    print(f"🏷️  Matched tag: {predicted_tag}")
-                    return response
-                    
-            except Exception as e:
-                print(f"AI model error: {e}")
+        if predicted_tag:
+            return ('model', predicted_tag)
+        
+        return ('fallback', None)
+    
+    def _match_model_tags(self, analyses):
+        """Best TF-IDF tag for each corrected query, or None below the threshold"""
+        if not self.model_data or not analyses:
+            return [None] * len(analyses)
+        try:
+            user_vecs = self.model_data['vectorizer'].transform([a.corrected_text for a in analyses])
+            best_match_idx, best_scores = self.pattern_index.best(user_vecs)
+        except Exception as e:
+            logger.exception("AI model error: %s", e)
+            return [None] * len(analyses)
+        
+        threshold = MATCH_THRESHOLDS[self.vectorizer_mode]
+        predicted_tags = []
+        for idx, score in zip(best_match_idx, best_scores):
+            logger.debug("🎯 AI Model score: %.3f", score)
+            predicted_tags.append(self.model_data['tags'][idx] if score > threshold else None)
+        return predicted_tags
+    
+    def _answer_match(self, user_input, analysis, match):
+        """Build the reply for a (stage, value) match; returns (stage that answered, reply)"""
+        stage, value = match
+        if stage == 'website':
+            analysis.intent = value
+            website_answer = self.get_website_answer(user_input, analysis)
+            if website_answer:
+                ANSWERS.inc('website', value)
+                return 'website', website_answer
+        elif stage == 'model':
+            logger.debug("🏷️  Matched tag: %s", value, extra={'tag': value})
+            ANSWERS.inc('model', value)
+            return 'model', random.choice(self.model_data['responses'][value])
         
         # Final fallback with context-aware response
-        return self._get_context_fallback(user_input)
+        ANSWERS.inc('fallback', analysis.intent or 'none')
+        return 'fallback', self._get_context_fallback(user_input, analysis)
     
-    def _get_context_fallback(self, user_input):
+    def _get_context_fallback(self, user_input, analysis=None):
         """Get context-aware fallback response"""
-        corrected_input = self.correct_spelling(user_input)
-        intent = self.detect_intent_from_keywords(corrected_input)
+        if analysis is None:
+            analysis = self.analyze_query(user_input)
+        intent = analysis.intent
         
         if intent == 'internship':
             return self._scrape_internship_info()
@@ -279,97 +450,356 @@ class SmartChatbot:
             ]
             return random.choice(fallbacks)
 
+def _skip_stage(analysis, stage):
+    analysis.skipped.append(stage)
+    STAGES_SKIPPED.inc(stage)
+
+def _answer_meta(answered_by, intent, analysis):
+    """Response metadata: the answering stage, the matched intent or tag, and how the deadline degraded the match"""
+    return {
+        'answered_by': answered_by,
+        'intent': intent,
+        'cached': analysis.cached,
+        'skipped': analysis.skipped,
+        'truncated': analysis.truncated
+    }
+
+class RemoteChatbot:
+    """Stands in for SmartChatbot in web processes whose messages are answered by scoring_daemon.py"""
+    model_data = None
+    
+    def __init__(self, client):
+        self.client = client
+        # The daemon reads the website pages; this one is never filled
+        self.page_cache = PageContentCache(WEBSITE_URL, [])
+        self.response_cache = _RemoteCacheStats(client)
+    
+    def get_response(self, user_input):
+        return self.get_responses([user_input])[0]
+    
+    def get_responses(self, user_inputs, deadline=None):
+        return [answer for answer, _ in self.respond(user_inputs, deadline)]
+    
+    def respond(self, user_inputs, deadline=None):
+        """Same as SmartChatbot.respond; the daemon applies its own deadline, so meta only names the answering stage"""
+        return [(answer, {'answered_by': stage, 'intent': value})
+                for stage, value, answer in self.client.answer(user_inputs)]
+    
+    def stream_response(self, user_input, deadline=None):
+        """Same events as SmartChatbot.stream_response; the daemon answers in one round trip"""
+        (answer, meta), = self.respond([user_input])
+        yield 'intent', {'stage': meta['answered_by'], 'intent': meta['intent']}
+        for chunk in _chunk_words(answer):
+            yield 'chunk', chunk
+        yield 'meta', meta
+
+class _RemoteCacheStats:
+    """The daemon's response cache statistics, for /api/cache/stats and /metrics"""
+    def __init__(self, client):
+        self.client = client
+    
+    def stats(self):
+        return self.client.stats()['response_cache']
+
 # Initialize chatbot
-chatbot = SmartChatbot()
+if SCORING_SOCKET:
+    from scoring_client import ScoringClient
+    chatbot = RemoteChatbot(ScoringClient(SCORING_SOCKET))
+else:
+    chatbot = SmartChatbot()
+    chatbot.page_cache.start()
+
+def _response_cache_stat(name):
+    """Read one response cache statistic of whichever chatbot is current"""
+    return lambda: {(): chatbot.response_cache.stats()[name]}
+
+for _stat, _kind, _help in (('hits', 'counter', 'Response cache hits (reset when a new model is swapped in)'),
+                            ('misses', 'counter', 'Response cache misses (reset when a new model is swapped in)'),
+                            ('evictions', 'counter', 'Response cache LRU evictions'),
+                            ('size', 'gauge', 'Entries in the response cache'),
+                            ('hit_rate', 'gauge', 'Response cache hits / lookups since the model was loaded')):
+    REGISTRY.callback(f'chatbot_response_cache_{_stat}' + ('_total' if _kind == 'counter' else ''),
+                      _help, _kind, _response_cache_stat(_stat))
+
+def _circuit_state():
+    """1 for the website circuit breaker's current state, 0 for the others"""
+    state = chatbot.page_cache.breaker.state
+    return {(name,): int(name == state) for name in CIRCUIT_STATES}
+
+# In client mode the daemon fetches the pages; this process has no circuit to report
+if not SCORING_SOCKET:
+    REGISTRY.callback('chatbot_upstream_circuit_state', 'Website circuit breaker state (1 for the current one)',
+                      'gauge', _circuit_state, ['state'])
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_time(response):
+    if request.endpoint in ('chat', 'chat_batch'):
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, request.endpoint)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of latency histograms, counters and cache stats"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 @app.route('/')
 def home():
     return render_template('professional_index.html')
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
+def _invalid_chat_body(data):
+    """Why a /api/chat or /api/chat/stream body can't be answered, or None if it can"""
+    if not isinstance(data, dict) or not isinstance(data.get('message', ''), str):
+        return "The request body must be a JSON object with a 'message' string"
+    return None
+
+def chat_reply(data):
+    """Answer one /api/chat request body; returns (JSON payload, HTTP status)"""
+    error = _invalid_chat_body(data)
+    if error:
+        logger.warning("⚠️  Rejected a chat request: %s", error)
+        return {'status': 'error', 'response': error}, 400
+    
     try:
-        user_message = request.json.get('message', '').strip()
-        print(f"👤 User: {user_message}")
+        user_message = data.get('message', '').strip()
+        logger.debug("👤 User: %s", user_message)
         
         if not user_message:
-            return jsonify({
+            return {
                 'status': 'success',
-                'response': "Welcome to Brainovision Solutions! 🎓 I'm your smart AI assistant. I can understand your questions even with small spelling mistakes. Ask me about courses, internships, or anything else!"
-            })
+                'response': WELCOME_MESSAGE,
+                'meta': {'answered_by': 'welcome'}
+            }, 200
         
-        bot_response = chatbot.get_response(user_message)
-        print(f"🤖 Bot: {bot_response}")
+        # Take one reference so a concurrent retrain can't swap models mid-request
+        bot = chatbot
+        (bot_response, meta), = bot.respond([user_message], Deadline(DEADLINE_SETTINGS['budget']))
+        logger.debug("🤖 Bot: %s", bot_response)
         
-        return jsonify({
+        return {
             'status': 'success',
-            'response': bot_response
-        })
+            'response': bot_response,
+            'meta': meta
+        }, 200
         
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return jsonify({
+        logger.exception("❌ Error: %s", e)
+        return {
             'status': 'error',
-            'response': f"I apologize for the inconvenience. Please visit our website directly: https://www.brainovision.in"
-        })
+            'response': "I apologize for the inconvenience. Please visit our website directly: https://www.brainovision.in"
+        }, 200
 
-@app.route('/train', methods=['GET'])
-def train_chatbot():
-    """Train the chatbot with website data"""
+def chat_batch_reply(data):
+    """Answer one /api/chat/batch request body; returns (JSON payload, HTTP status)"""
+    messages = data.get('messages') if isinstance(data, dict) else None
+    if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+        error = "The request body must be a JSON object with a 'messages' list of strings"
+        logger.warning("⚠️  Rejected a chat batch request: %s", error)
+        return {'status': 'error', 'response': error}, 400
+    if len(messages) > MAX_BATCH_SIZE:
+        return {'status': 'error', 'response': f"At most {MAX_BATCH_SIZE} messages per batch"}, 400
+    
     try:
-        from website_scraper import WebsiteScraper
-        import pickle
-        from sklearn.feature_extraction.text import TfidfVectorizer
+        messages = [m.strip() for m in messages]
+        questions = [m for m in messages if m]
         
-        # Scrape website and generate training data
-        scraper = WebsiteScraper()
-        training_data = scraper.save_training_data()
-        
-        # Prepare training data for AI model
-        patterns = []
-        tags = []
-        responses_dict = {}
+        # Take one reference so a concurrent retrain can't swap models mid-batch
+        bot = chatbot
+        replies = iter(bot.respond(questions, Deadline(DEADLINE_SETTINGS['batch_budget'])))
+        replies = [next(replies) if m else (WELCOME_MESSAGE, {'answered_by': 'welcome'}) for m in messages]
         
-        for intent in training_data['intents']:
-            tag = intent['tag']
-            responses_dict[tag] = intent['responses']
-            
-            for pattern in intent['patterns']:
-                patterns.append(pattern.lower())
-                tags.append(tag)
+        return {
+            'status': 'success',
+            'responses': [answer for answer, _ in replies],
+            'meta': [meta for _, meta in replies]
+        }, 200
         
-        # Train TF-IDF
-        vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        tfidf_matrix = vectorizer.fit_transform(patterns)
-        
-        # Save model
-        model_data = {
-            'vectorizer': vectorizer,
-            'patterns': patterns,
-            'tags': tags,
-            'responses': responses_dict,
-            'tfidf_matrix': tfidf_matrix
-        }
+    except Exception as e:
+        logger.exception("❌ Error: %s", e)
+        return {
+            'status': 'error',
+            'response': "I apologize for the inconvenience. Please visit our website directly: https://www.brainovision.in"
+        }, 200
+
+def _sse(event, data):
+    """One server-sent event carrying a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def chat_stream_events(data):
+    """Answer one /api/chat/stream request body as server-sent events.
+
+    'intent' arrives as soon as the message is matched, 'chunk' events carry
+    the reply text, 'meta' says which stage answered, and the stream ends
+    with 'done' (or 'error').
+    """
+    start = time.perf_counter()
+    error = _invalid_chat_body(data)
+    if error:
+        logger.warning("⚠️  Rejected a chat request: %s", error)
+        yield _sse('error', {'status': 'error', 'response': error})
+        return
+    
+    try:
+        user_message = data.get('message', '').strip()
+        logger.debug("👤 User: %s", user_message)
         
-        with open('website_training_data.pkl', 'wb') as f:
-            pickle.dump(model_data, f)
+        if not user_message:
+            TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start, 'chat_stream')
+            yield _sse('chunk', {'text': WELCOME_MESSAGE})
+            yield _sse('meta', {'answered_by': 'welcome'})
+            yield _sse('done', {'status': 'success'})
+            return
         
-        # Reload chatbot
-        global chatbot
-        chatbot = SmartChatbot()
+        # Take one reference so a concurrent retrain can't swap models mid-request
+        bot = chatbot
+        first_chunk = True
+        for event, payload in bot.stream_response(user_message, Deadline(DEADLINE_SETTINGS['budget'])):
+            if event == 'chunk':
+                if first_chunk:
+                    TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - start, 'chat_stream')
+                    first_chunk = False
+                payload = {'text': payload}
+            yield _sse(event, payload)
+        yield _sse('done', {'status': 'success'})
         
-        return jsonify({
-            'status': 'success', 
-            'message': 'Smart chatbot trained successfully! Now understands spelling mistakes.',
-            'intents_count': len(training_data['intents'])
+    except Exception as e:
+        logger.exception("❌ Error: %s", e)
+        yield _sse('error', {
+            'status': 'error',
+            'response': "I apologize for the inconvenience. Please visit our website directly: https://www.brainovision.in"
         })
+
+# The handlers share chat_reply, chat_batch_reply and chat_stream_events with
+# the async server in asgi.py
+@app.route('/api/chat', methods=['POST'])
+def chat():
+    payload, status = chat_reply(request.get_json(silent=True))
+    return jsonify(payload), status
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    payload, status = chat_batch_reply(request.get_json(silent=True))
+    return jsonify(payload), status
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    return Response(chat_stream_events(request.get_json(silent=True)), content_type='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _run_training(job, crawl=False, vectorizer_mode=VECTORIZER_MODE):
+    """Scrape, fit and swap in a new chatbot; runs on the training thread"""
+    global chatbot
+    from website_scraper import WebsiteScraper
+    
+    # Workers of a prefork server share the manifest, training data and
+    # model files; a /train in another one waits here until it is written
+    with training_lock():
+        # Scrape website and generate training data
+        job.set_phase('scraping')
+        scraper = WebsiteScraper(WEBSITE_URL, crawl=crawl)
+        training_data = scraper.save_training_data()
         
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)})
+        # Skip re-fitting when every page came back unchanged
+        if (not scraper.site_changed and chatbot.model_data is not None
+                and chatbot.vectorizer_mode == vectorizer_mode):
+            scraper.save_manifest()
+            return {'intents_count': len(training_data['intents']), 'unchanged': True}
+        
+        # Train TF-IDF
+        job.set_phase('fitting')
+        model_data = build_model(training_data, vectorizer_mode)
+        
+        job.set_phase('saving')
+        save_model(model_data)
+        # Only now is the new content in the model; a failed fit leaves the
+        # old manifest behind, so the next /train sees the changes again
+        scraper.save_manifest()
+    # A scoring daemon picks the new model file up by itself
+    if isinstance(chatbot, RemoteChatbot):
+        return {'intents_count': len(training_data['intents'])}
+    
+    # Build the replacement fully before swapping it in, so in-flight chat
+    # requests keep using the old instance they already hold
+    job.set_phase('loading')
+    new_chatbot = SmartChatbot(chatbot.page_cache, model_data=model_data,
+                               index_settings=chatbot.index_settings)
+    with chatbot_swap_lock:
+        chatbot = new_chatbot
+    
+    return {'intents_count': len(training_data['intents'])}
+
+chatbot_swap_lock = threading.Lock()
+
+def reload_model_if_changed():
+    """Swap in a chatbot on the current model file if it was replaced since ours was loaded.
+
+    Lets processes that share one model file (see prefork.py) follow a /train
+    run in any of them. Returns True if a new model was loaded.
+    """
+    global chatbot
+    if isinstance(chatbot, RemoteChatbot):
+        return False
+    file_id = model_file_id()
+    if file_id is None or file_id == chatbot.model_file_id:
+        return False
+    
+    new_chatbot = SmartChatbot(chatbot.page_cache, index_settings=chatbot.index_settings)
+    if new_chatbot.model_data is None:
+        return False
+    with chatbot_swap_lock:
+        chatbot = new_chatbot
+    logger.info("🔄 Reloaded the model file after it was replaced")
+    return True
+
+training_runner = TrainingRunner(_run_training)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss/eviction counters of the current chatbot's response cache"""
+    return jsonify({'status': 'success', 'response_cache': chatbot.response_cache.stats()})
+
+@app.route('/train', methods=['GET', 'POST'])
+def train_chatbot():
+    """Start training the chatbot with website data in the background"""
+    # ?crawl=1 follows the site's links instead of the five known pages
+    crawl = request.args.get('crawl', '').lower() in ('1', 'true', 'yes')
+    # ?mode=char fits a character n-gram model instead of the word model
+    mode = request.args.get('mode', VECTORIZER_MODE)
+    if mode not in VECTORIZER_MODES:
+        return jsonify({'status': 'error', 'message': f"Unknown mode {mode!r}"}), 400
+    try:
+        job = training_runner.start(crawl=crawl, vectorizer_mode=mode)
+    except TrainingConflict as e:
+        # Only one run at a time; say which one instead of dropping the options
+        return jsonify({
+            'status': 'error',
+            'message': 'A training job with different options is already running.',
+            'job_id': e.job.id,
+            'options': e.job.options,
+            'status_url': f"/train/{e.job.id}"
+        }), 409
+    return jsonify({
+        'status': 'accepted',
+        'message': 'Training started. Poll the status URL for progress.',
+        'job_id': job.id,
+        'status_url': f"/train/{job.id}"
+    }), 202
+
+@app.route('/train/<job_id>', methods=['GET'])
+def training_status(job_id):
+    """Report the phase and elapsed time of a training job"""
+    job = training_runner.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown training job'}), 404
+    
+    return jsonify({'status': 'success', **job.to_dict()})
 
 if __name__ == '__main__':
     print("🚀 Starting Smart Brainovision Chatbot...")
     print("🎯 Now with spelling correction and fuzzy matching!")
-    print("🌐 Website: https://www.brainovision.in")
+    print(f"🌐 Website: {WEBSITE_URL}")
     print("📍 Chat: http://localhost:5000")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
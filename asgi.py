@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from a2wsgi import WSGIMiddleware
+import app as chatbot_app
+from logging_config import get_logger
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS
+
+logger = get_logger('asgi')
+
+# scoring_workers threads run the CPU-bound chat pipeline; at most max_queued
+# more requests wait for one before new ones are turned away with a 503.
+# Upstream pages are fetched on the event loop through one pooled client.
+ASYNC_SETTINGS = {
+    'scoring_workers': 4,
+    'max_queued': 64,
+    'max_connections': 20,
+    'max_keepalive_connections': 10,
+    'max_body_bytes': 1024 * 1024
+}
+
+BUSY_MESSAGE = "The assistant is busy right now. Please try again in a moment."
+
+
+class ChatASGIApp:
+    """ASGI entry point: chat endpoints served natively, every other route by the Flask app"""
+    def __init__(self, flask_app, settings=None):
+        self.settings = dict(ASYNC_SETTINGS, **(settings or {}))
+        self.fallback = WSGIMiddleware(flask_app)
+        self.routes = {
+            ('POST', '/api/chat'): ('chat', chatbot_app.chat_reply),
+            ('POST', '/api/chat/batch'): ('chat_batch', chatbot_app.chat_batch_reply),
+            ('POST', '/api/chat/stream'): ('chat_stream', chatbot_app.chat_stream_events)
+        }
+        self.executor = None
+        self.client = None
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http' and (scope['method'], scope['path']) in self.routes:
+            await self._chat(scope, receive, send)
+        elif scope['type'] == 'http' and scope['path'] == '/metrics':
+            await self._respond(send, 200, REGISTRY.render().encode('utf-8'), CONTENT_TYPE)
+        else:
+            await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def startup(self):
+        """Create the scoring pool and the shared upstream client, and move page fetches onto the loop"""
+        settings = self.settings
+        self.executor = ThreadPoolExecutor(max_workers=settings['scoring_workers'],
+                                           thread_name_prefix='scoring')
+        self._slots = asyncio.Semaphore(settings['scoring_workers'] + settings['max_queued'])
+        limits = httpx.Limits(max_connections=settings['max_connections'],
+                              max_keepalive_connections=settings['max_keepalive_connections'])
+        self.client = httpx.AsyncClient(limits=limits, follow_redirects=True)
+        # Retrained chatbots reuse the same page cache, so this holds across swaps
+        chatbot_app.chatbot.page_cache.attach(asyncio.get_running_loop(), self.client, self.executor)
+        logger.info("⚡ Async server ready with %d scoring workers", settings['scoring_workers'])
+
+    async def shutdown(self):
+        chatbot_app.chatbot.page_cache.detach()
+        await self.client.aclose()
+        self.executor.shutdown(wait=False)
+
+    async def _chat(self, scope, receive, send):
+        endpoint, handler = self.routes[(scope['method'], scope['path'])]
+        start = time.perf_counter()
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond_json(send, 413, {'status': 'error', 'response': "Request body too large"})
+            return
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+
+        # Shed load instead of letting the executor queue grow without bound
+        if self._slots.locked():
+            await self._respond_json(send, 503, {'status': 'error', 'response': BUSY_MESSAGE},
+                                     [(b'retry-after', b'1')])
+            return
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            if endpoint == 'chat_stream':
+                await self._stream(send, handler(data))
+                return
+            payload, status = await loop.run_in_executor(self.executor, handler, data)
+
+        await self._respond_json(send, status, payload)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+
+    async def _stream(self, send, events):
+        """Send each event of a generator as soon as the executor has produced it"""
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                        (b'x-accel-buffering', b'no')]
+        })
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await loop.run_in_executor(self.executor, next, events, None)
+            if event is None:
+                break
+            await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _read_body(self, receive):
+        """The whole request body, or None once it exceeds max_body_bytes"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.settings['max_body_bytes']:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _respond_json(self, send, status, payload, headers=()):
+        body = json.dumps(payload).encode('utf-8')
+        await self._respond(send, status, body, 'application/json', headers)
+
+    async def _respond(self, send, status, body, content_type, headers=()):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', content_type.encode('latin-1')),
+                        (b'content-length', str(len(body)).encode('latin-1')), *headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+application = ChatASGIApp(chatbot_app.app)
+
+if __name__ == '__main__':
+    import uvicorn
+    print("🚀 Starting Smart Brainovision Chatbot (async server)...")
+    print(f"🌐 Website: {chatbot_app.WEBSITE_URL}")
+    print("📍 Chat: http://localhost:8000")
+    uvicorn.run(application, host='0.0.0.0', port=8000)
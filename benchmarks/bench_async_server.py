@@ -0,0 +1,134 @@
+"""Load test of the async server (asgi.py) while slow upstream fetches are in flight.
+
+The stub website answers every page after --delay seconds and the page
+cache TTL is shortened so refreshes are re-queued throughout the run. Chat
+requests must keep being answered in milliseconds while the fetches wait
+on the shared async client. The Flask dev server is run through the same
+scenario for reference. Exits with status 1 if any async chat request took
+as long as one upstream fetch, or if the async server fetched pages with
+anything but its httpx client.
+
+Run from the repository root: python benchmarks/bench_async_server.py
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from load_generator import build_query_mix, free_port, print_results, run_load, train_model
+from stub_site import StubSite
+
+PAGE_TTL = 0.5
+
+SERVERS = {
+    'asgi': r'''
+import sys
+sys.path.insert(0, {root!r})
+import uvicorn
+import asgi
+asgi.chatbot_app.chatbot.page_cache.ttl = {ttl}
+uvicorn.run(asgi.application, host='127.0.0.1', port={port}, log_level='warning')
+''',
+    'flask': r'''
+import sys
+sys.path.insert(0, {root!r})
+import app
+app.chatbot.page_cache.ttl = {ttl}
+app.app.run(host='127.0.0.1', port={port}, threaded=True)
+'''
+}
+
+
+def start(kind, website_url, workdir, timeout=30):
+    port = free_port()
+    env = dict(os.environ, CHATBOT_WEBSITE_URL=website_url)
+    code = SERVERS[kind].format(root=ROOT, port=port, ttl=PAGE_TTL)
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/metrics", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+def upstream_fetches(url):
+    """(count, total seconds) of upstream fetches the server has finished"""
+    text = requests.get(f"{url}/metrics", timeout=5).text
+    count = sum(float(v) for v in re.findall(r'^chatbot_upstream_fetch_seconds_count\S* (\S+)$', text, re.M))
+    total = sum(float(v) for v in re.findall(r'^chatbot_upstream_fetch_seconds_sum\S* (\S+)$', text, re.M))
+    return count, total
+
+
+def run(kind, site, workdir, queries, concurrency):
+    process, url = start(kind, site.url, workdir)
+    try:
+        before = upstream_fetches(url)
+        clients_before = site.server.user_agents.copy()
+        results = run_load(url, queries, concurrency)
+        # Let the fetches that were in flight during the run finish
+        time.sleep(site.server.delay + 0.5)
+        after = upstream_fetches(url)
+        clients = site.server.user_agents - clients_before
+    finally:
+        process.terminate()
+        process.wait()
+    fetches = after[0] - before[0]
+    results['upstream_fetches'] = fetches
+    results['upstream_mean_seconds'] = (after[1] - before[1]) / fetches if fetches else 0.0
+    results['upstream_clients'] = dict(clients)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--delay', type=float, default=2.0, help="Seconds the stub site takes per page")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        queries = build_query_mix(json.load(f), args.requests)
+    workdir = tempfile.mkdtemp()
+    train_model(workdir)
+
+    failures = []
+    with StubSite(delay=args.delay) as site:
+        for kind in ('asgi', 'flask'):
+            results = run(kind, site, workdir, queries, args.concurrency)
+            print(f"\n{kind} server, upstream delay {args.delay:.1f}s, concurrency {args.concurrency}")
+            print_results(results)
+            print(f"slowest chat request {results['max_seconds'] * 1e3:.2f}ms  "
+                  f"upstream fetches finished: {results['upstream_fetches']:.0f}  "
+                  f"mean {results['upstream_mean_seconds']:.2f}s  "
+                  f"by client: {results['upstream_clients']}")
+            if kind != 'asgi':
+                continue
+            if results['errors'] or results['max_seconds'] >= args.delay:
+                failures.append("async chat requests waited on the upstream fetch")
+            clients = results['upstream_clients']
+            if not clients.get('python-httpx') or set(clients) != {'python-httpx'}:
+                failures.append("the async server did not fetch pages with its httpx client")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
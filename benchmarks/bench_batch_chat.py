@@ -0,0 +1,81 @@
+"""Per-message vs batched chat scoring on the training patterns.
+
+Run from the repository root:  python benchmarks/bench_batch_chat.py
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_site import point_app_at_stub
+
+SITE = point_app_at_stub()
+from app import QueryAnalysis, SmartChatbot
+from page_cache import PageContentCache
+from response_cache import ResponseCache
+from training import build_model
+
+
+def load_queries(training_data, seed=0):
+    """Every training pattern, plus a copy of each with one character dropped"""
+    rnd = random.Random(seed)
+    patterns = [p for intent in training_data['intents'] for p in intent['patterns']]
+    typos = []
+    for pattern in patterns:
+        i = rnd.randrange(len(pattern))
+        typos.append(pattern[:i] + pattern[i + 1:])
+    return patterns + typos
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    queries = load_queries(training_data)
+
+    # No response caching, and pages fetched once up front so both runs read the same content
+    page_cache = PageContentCache(SITE.url, ['/internship', '/courses'])
+    for url in page_cache.urls:
+        page_cache.refresh(url)
+    bot = SmartChatbot(page_cache=page_cache,
+                       model_data=build_model(training_data),
+                       response_cache=ResponseCache(max_size=0))
+    analyses = [QueryAnalysis(q.lower(), q.lower(), None) for q in queries]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Warm the spelling and keyword caches so both runs do the same work
+        bot.get_responses(queries)
+
+        random.seed(0)
+        single_answers = [bot.get_response(q) for q in queries]
+        random.seed(0)
+        batch_answers = bot.get_responses(queries)
+
+        score_single = best_of(lambda: [bot._match_model_tags([a]) for a in analyses])
+        score_batch = best_of(lambda: bot._match_model_tags(analyses))
+        chat_single = best_of(lambda: [bot.get_response(q) for q in queries])
+        chat_batch = best_of(lambda: bot.get_responses(queries))
+
+    print(f"{len(queries)} queries, answers identical: {single_answers == batch_answers}")
+    print(f"{'stage':>14} {'per message':>12} {'batched':>10} {'speedup':>8}")
+    for stage, single, batch in (('TF-IDF scoring', score_single, score_batch),
+                                 ('full pipeline', chat_single, chat_batch)):
+        print(f"{stage:>14} {single * 1e3:>10.1f}ms {batch * 1e3:>8.1f}ms {single / batch:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Word TF-IDF with spelling correction vs character n-gram TF-IDF without it.
+
+Both models are fitted on the training patterns that contain no known
+misspelling (a variation listed in SmartChatbot.common_misspellings), and
+evaluated on the held-out misspelled patterns plus every clean pattern with
+a listed misspelling substituted in, both as they are and wrapped in a
+longer sentence. The word pipeline spell-corrects each query before
+scoring; the char pipeline scores it as typed. Latency is per single query
+with a cold correction cache, from raw text to matched tag.
+
+Run from the repository root:  python benchmarks/bench_char_ngrams.py
+"""
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+SENTENCE = "could you please tell me about {}"
+
+from page_cache import PageContentCache
+from similarity import PatternIndex
+from spelling import SpellingCorrector
+from training import build_model
+
+from stub_site import point_app_at_stub
+
+point_app_at_stub()
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import MATCH_THRESHOLDS, SmartChatbot
+
+
+def split_patterns(training_data, misspellings):
+    """(clean training data, [(misspelled query, tag), ...])"""
+    typos = {v: word for word, variations in misspellings.items() for v in variations if v != word}
+    clean = {'intents': []}
+    queries = []
+    for intent in training_data['intents']:
+        kept = []
+        for pattern in intent['patterns']:
+            words = re.findall(r'\w+', pattern.lower())
+            if any(w in typos for w in words):
+                queries.append((pattern.lower(), intent['tag']))
+            else:
+                kept.append(pattern)
+                for word in set(words):
+                    for variation in misspellings.get(word, []):
+                        if variation != word:
+                            queries.append((re.sub(rf'\b{word}\b', variation, pattern.lower()), intent['tag']))
+        clean['intents'].append(dict(intent, patterns=kept))
+    return clean, queries
+
+
+def make_pipeline(training_data, vectorizer_mode, misspellings):
+    model_data = build_model(training_data, vectorizer_mode)
+    index = PatternIndex(model_data['tfidf_matrix'])
+    threshold = MATCH_THRESHOLDS[vectorizer_mode]
+    corrector = SpellingCorrector(misspellings) if vectorizer_mode == 'word' else None
+
+    def match(text):
+        if corrector is not None:
+            corrector._cache.clear()
+            text = corrector.correct(text)
+        best, scores = index.best(model_data['vectorizer'].transform([text]))
+        return model_data['tags'][best[0]] if scores[0] > threshold else None
+
+    return match
+
+
+def main():
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        misspellings = SmartChatbot(page_cache=PageContentCache('http://127.0.0.1:9', []),
+                                    model_data={}).common_misspellings
+    clean_data, queries = split_patterns(training_data, misspellings)
+    patterns = sum(len(intent['patterns']) for intent in clean_data['intents'])
+    print(f"{patterns} clean training patterns, {len(queries)} misspelled queries")
+
+    print(f"{'pipeline':>22} {'accuracy':>9} {'in sentence':>12} {'p50':>9} {'p99':>9}")
+    for name, mode in (('word + correction', 'word'), ('char_wb n-grams', 'char')):
+        match = make_pipeline(clean_data, mode, misspellings)
+        times = []
+        correct = 0
+        for text, tag in queries:
+            start = time.perf_counter()
+            predicted = match(text)
+            times.append(time.perf_counter() - start)
+            correct += predicted == tag
+        in_sentence = sum(match(SENTENCE.format(text)) == tag for text, tag in queries)
+        print(f"{name:>22} {correct / len(queries):>8.1%} {in_sentence / len(queries):>11.1%} "
+              f"{np.percentile(times, 50) * 1e6:>7.0f}us {np.percentile(times, 99) * 1e6:>7.0f}us")
+
+
+if __name__ == '__main__':
+    main()
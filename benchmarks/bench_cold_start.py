@@ -0,0 +1,75 @@
+"""Cold start: importing app.py and answering the first chat message.
+
+Every run is a fresh interpreter in a scratch directory holding a freshly
+trained model file. The medians are checked against BUDGET, and the script
+exits with status 1 when a budget is exceeded or a training-only module
+is imported on the chat path, so it can gate CI.
+
+Run from the repository root:  python benchmarks/bench_cold_start.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_site import StubSite
+from training import build_model, save_model
+
+# Seconds, medians over the runs
+BUDGET = {'import': 0.8, 'first_response': 0.2}
+# Needed only by /train, so the chat path must not import them
+TRAINING_ONLY_MODULES = ('sklearn', 'bs4', 'nltk', 'website_scraper')
+
+CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.chatbot.page_cache.stop()
+app.app.test_client().post('/api/chat', json={{'message': 'what courses do you ofer'}})
+answered = time.perf_counter()
+loaded = [m for m in {modules!r} if m in sys.modules]
+with open('cold_start.json', 'w') as f:
+    json.dump({{'import': imported - start, 'first_response': answered - imported, 'loaded': loaded}}, f)
+'''
+
+
+def run_once(workdir, website_url):
+    code = CHILD.format(root=ROOT, modules=TRAINING_ONLY_MODULES)
+    env = dict(os.environ, CHATBOT_WEBSITE_URL=website_url)
+    subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env, capture_output=True, check=True)
+    with open(os.path.join(workdir, 'cold_start.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    workdir = tempfile.mkdtemp()
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        save_model(build_model(json.load(f)), os.path.join(workdir, 'website_training_data.model'))
+
+    with StubSite() as site:
+        results = [run_once(workdir, site.url) for _ in range(runs)]
+    ok = True
+    print(f"{'stage':>15} {'median':>9} {'max':>9} {'budget':>9}")
+    for stage, budget in BUDGET.items():
+        times = [result[stage] for result in results]
+        median = statistics.median(times)
+        ok = ok and median <= budget
+        status = 'ok' if median <= budget else 'OVER'
+        print(f"{stage:>15} {median * 1e3:>7.0f}ms {max(times) * 1e3:>7.0f}ms {budget * 1e3:>7.0f}ms  {status}")
+
+    loaded = sorted({module for result in results for module in result['loaded']})
+    print(f"training-only modules imported: {', '.join(loaded) or 'none'}")
+    if loaded or not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Page extraction: BeautifulSoup tree vs single-pass streaming extractor.
+
+Run from the repository root:  python benchmarks/bench_html_extract.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extractor import extract_stream
+from website_scraper import WebsiteScraper
+
+CHUNK_SIZE = 65536
+
+
+def build_page(sections, seed=0):
+    """A course-catalogue style page with the given number of sections"""
+    rnd = random.Random(seed)
+    words = ("python java full stack internship stipend training course project "
+             "mentor placement django spring data science machine learning").split()
+    parts = ["<html><head><title>Brainovision Courses</title>",
+             "<style>body { color: #333; }</style></head><body>"]
+    for i in range(sections):
+        sentence = ' '.join(rnd.choice(words) for _ in range(25))
+        parts.append(f"<div class='section'><h2>Section {i}: {rnd.choice(words).title()} Program</h2>")
+        parts.append(f"<p>{sentence}.</p><ul>")
+        for j in range(4):
+            parts.append(f"<li>Module {j} covers {rnd.choice(words)} and {rnd.choice(words)}</li>")
+        parts.append("</ul><script>track('section');</script></div>")
+    parts.append("</body></html>")
+    return ''.join(parts).encode('utf-8')
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.process_time()
+    result = func()
+    cpu = time.process_time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def main():
+    scraper = WebsiteScraper.__new__(WebsiteScraper)
+    print(f"{'page':>8} {'soup cpu':>9} {'soup peak':>10} {'stream cpu':>11} {'stream peak':>12}")
+    for sections in (100, 1000, 5000):
+        page = build_page(sections)
+
+        def chunks():
+            # Stands in for response.iter_content(): the body is never joined
+            for offset in range(0, len(page), CHUNK_SIZE):
+                yield page[offset:offset + CHUNK_SIZE]
+
+        soup_records, soup_cpu, soup_peak = measure(lambda: scraper.extract_content(page))
+        stream_records, stream_cpu, stream_peak = measure(lambda: extract_stream(chunks()))
+        assert soup_records == stream_records
+
+        print(f"{len(page) / 1e6:>6.2f}MB {soup_cpu:>8.2f}s {soup_peak / 1e6:>8.1f}MB "
+              f"{stream_cpu:>10.2f}s {stream_peak / 1e6:>10.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
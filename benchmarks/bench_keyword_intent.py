@@ -0,0 +1,103 @@
+"""Keyword intent scoring: original nested loops vs KeywordIntentScorer.
+
+Run from the repository root:  python benchmarks/bench_keyword_intent.py
+"""
+import os
+import random
+import string
+import sys
+import time
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_scorer import KeywordIntentScorer
+
+KEYWORD_GROUPS = {
+    'internship': ['internship', 'stipend', 'work experience', 'practical training', 'industrial training', 'on-job training'],
+    'courses': ['course', 'program', 'training', 'learn', 'study', 'subject', 'curriculum', 'syllabus'],
+    'python': ['python', 'django', 'flask', 'full stack'],
+    'java': ['java', 'spring', 'hibernate', 'j2ee'],
+    'ai_ml': ['artificial intelligence', 'machine learning', 'ai', 'ml', 'neural network', 'deep learning'],
+    'data_science': ['data science', 'data analytics', 'big data', 'data analysis'],
+    'contact': ['contact', 'phone', 'email', 'address', 'location', 'reach'],
+    'about': ['about', 'company', 'brainovision', 'who are you', 'what is']
+}
+
+QUERIES = [
+    "do you provide internship", "what corse do you offer", "pythn full stack course",
+    "tell me about brainovision", "machin lerning program", "how can i contact you",
+    "is there a stipend for the intership", "data analytics and big data training",
+    "who are you", "hello there", "what is the fee for java spring",
+]
+
+
+def legacy_detect(keyword_groups, text):
+    """The scoring loop SmartChatbot.detect_intent_from_keywords used to run"""
+    text_lower = text.lower()
+    intent_scores = {}
+    for intent, keywords in keyword_groups.items():
+        score = 0
+        for keyword in keywords:
+            if keyword in text_lower:
+                score += 2
+            else:
+                for word in text_lower.split():
+                    if len(word) > 3:
+                        for kw in keyword.split():
+                            if SequenceMatcher(None, word, kw).ratio() > 0.8:
+                                score += 1
+                                break
+        if score > 0:
+            intent_scores[intent] = score
+    if intent_scores:
+        return max(intent_scores.items(), key=lambda x: x[1])
+    return None, 0
+
+
+def scaled_groups(factor, seed=0):
+    """keyword_groups padded with synthetic keywords to factor x the size"""
+    rnd = random.Random(seed)
+    groups = {}
+    for intent, keywords in KEYWORD_GROUPS.items():
+        extra = []
+        for _ in range(len(keywords) * (factor - 1)):
+            words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 10)))
+                     for _ in range(rnd.randint(1, 2))]
+            extra.append(' '.join(words))
+        groups[intent] = keywords + extra
+    return groups
+
+
+def time_per_query(func, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def main():
+    print(f"{'scale':>6} {'keywords':>9} {'legacy (us)':>12} {'cold (us)':>10} {'warm (us)':>10} {'speedup':>8}")
+    for factor in (1, 10, 100):
+        groups = scaled_groups(factor)
+        scorer = KeywordIntentScorer(groups)
+        for query in QUERIES:
+            assert scorer.detect(query) == legacy_detect(groups, query), query
+
+        repeat = max(1, 20 // factor)
+        legacy = time_per_query(lambda q: legacy_detect(groups, q), QUERIES, repeat)
+
+        def cold_detect(query):
+            scorer._word_cache.clear()
+            return scorer.detect(query)
+
+        cold = time_per_query(cold_detect, QUERIES, 5)
+        warm = time_per_query(scorer.detect, QUERIES, 50)
+        keywords = sum(len(v) for v in groups.values())
+        print(f"{factor:>5}x {keywords:>9} {legacy * 1e6:>12.1f} {cold * 1e6:>10.1f} "
+              f"{warm * 1e6:>10.1f} {legacy / cold:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
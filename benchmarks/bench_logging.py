@@ -0,0 +1,55 @@
+"""Per-message cost of chat logging at each setting.
+
+Logs go to os.devnull, so this measures the request thread's share only.
+
+Run from the repository root:  python benchmarks/bench_logging.py
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_site import point_app_at_stub
+
+point_app_at_stub()
+from app import SmartChatbot
+from logging_config import configure_logging
+from page_cache import PageContentCache
+from response_cache import ResponseCache
+from training import build_model
+
+SETTINGS = [
+    ('off (INFO)', {'level': 'INFO'}),
+    ('DEBUG, text', {'level': 'DEBUG'}),
+    ('DEBUG, JSON', {'level': 'DEBUG', 'json_logs': True}),
+    ('DEBUG, JSON 1%', {'level': 'DEBUG', 'json_logs': True, 'sample_rate': 0.01}),
+]
+
+
+def main():
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    queries = [p for intent in training_data['intents'] for p in intent['patterns']] * 10
+    bot = SmartChatbot(page_cache=PageContentCache('http://127.0.0.1:9', []),
+                       model_data=build_model(training_data),
+                       response_cache=ResponseCache(max_size=0))
+
+    with open(os.devnull, 'w') as devnull:
+        print(f"{'logging':>16} {'per message':>12}")
+        for name, settings in SETTINGS:
+            configure_logging(stream=devnull, **settings)
+            for query in queries[:100]:
+                bot.get_response(query)
+            start = time.perf_counter()
+            for query in queries:
+                bot.get_response(query)
+            elapsed = (time.perf_counter() - start) / len(queries)
+            print(f"{name:>16} {elapsed * 1e6:>10.1f}us")
+        configure_logging()
+
+
+if __name__ == '__main__':
+    main()
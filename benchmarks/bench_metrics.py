@@ -0,0 +1,65 @@
+"""Overhead of the latency and counter instrumentation on chat answers.
+
+Run from the repository root:  python benchmarks/bench_metrics.py
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stub_site import point_app_at_stub
+
+point_app_at_stub()
+import metrics
+from app import SmartChatbot
+from page_cache import PageContentCache
+from response_cache import ResponseCache
+from training import build_model
+
+
+def per_message(bot, queries, repeat=7):
+    """Best per-message time with metrics off and on, alternating runs to cancel drift"""
+    best = {False: float('inf'), True: float('inf')}
+    for _ in range(repeat):
+        for enabled in (False, True):
+            metrics.set_enabled(enabled)
+            start = time.perf_counter()
+            for query in queries:
+                bot.get_response(query)
+            best[enabled] = min(best[enabled], (time.perf_counter() - start) / len(queries))
+    metrics.set_enabled(True)
+    return best[False], best[True]
+
+
+def main():
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    queries = [p for intent in training_data['intents'] for p in intent['patterns']]
+    model_data = build_model(training_data)
+
+    print(f"{'response cache':>15} {'metrics off':>12} {'metrics on':>11} {'overhead':>9}")
+    for name, cache_size in (('disabled', 0), ('warm', 2048)):
+        bot = SmartChatbot(page_cache=PageContentCache('http://127.0.0.1:9', []), model_data=model_data,
+                           response_cache=ResponseCache(max_size=cache_size))
+        bot.get_responses(queries)
+        off, on = per_message(bot, queries)
+        print(f"{name:>15} {off * 1e6:>10.1f}us {on * 1e6:>9.1f}us {(on - off) * 1e6:>7.1f}us")
+
+    histogram = metrics.Histogram('bench_seconds', 'Benchmark histogram', ['stage'])
+    start = time.perf_counter()
+    for _ in range(100000):
+        histogram.observe(0.0003, 'spelling')
+    observe = (time.perf_counter() - start) / 100000
+
+    start = time.perf_counter()
+    text = metrics.REGISTRY.render()
+    render = time.perf_counter() - start
+    print(f"one histogram observe: {observe * 1e9:.0f}ns, /metrics render: {render * 1e3:.2f}ms "
+          f"({len(text.splitlines())} lines)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Model load time: legacy pickle vs memory-mapped model file.
+
+Run from the repository root:  python benchmarks/bench_model_load.py
+"""
+import json
+import os
+import pickle
+import random
+import string
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_store import load_model_file, save_model_file
+from training import build_model
+
+
+def scaled_training_data(factor, seed=0):
+    """The shipped training data plus synthetic patterns, factor x the size"""
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+
+    rnd = random.Random(seed)
+    words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 9)))
+             for _ in range(5000)]
+    for intent in training_data['intents']:
+        extra = [' '.join(rnd.choice(words) for _ in range(rnd.randint(2, 6)))
+                 for _ in range(len(intent['patterns']) * (factor - 1))]
+        intent['patterns'] = intent['patterns'] + extra
+    return training_data
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_pickle(filename):
+    with open(filename, 'rb') as f:
+        return pickle.load(f)
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    pickle_file = os.path.join(workdir, 'website_training_data.pkl')
+    model_file = os.path.join(workdir, 'website_training_data.model')
+
+    print(f"{'patterns':>9} {'pickle':>10} {'model file':>11} {'pickle load':>12} {'model load':>11}")
+    for factor in (1, 10, 100):
+        model_data = build_model(scaled_training_data(factor))
+        with open(pickle_file, 'wb') as f:
+            pickle.dump(model_data, f)
+        save_model_file(model_data, model_file)
+
+        pickled = best_of(lambda: load_pickle(pickle_file))
+        mapped = best_of(lambda: load_model_file(model_file))
+        print(f"{model_data['tfidf_matrix'].shape[0]:>9} "
+              f"{os.path.getsize(pickle_file) / 1e6:>8.2f}MB {os.path.getsize(model_file) / 1e6:>9.2f}MB "
+              f"{pickled * 1e3:>10.2f}ms {mapped * 1e3:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
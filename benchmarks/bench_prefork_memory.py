@@ -0,0 +1,147 @@
+"""Memory per worker of prefork.py as the worker count grows, against independent processes.
+
+For each worker count, the prefork launcher (Flask workers, so both sides
+run the same server) and the same number of separately started app.py
+servers are each warmed with chat traffic. Then every process's RSS, PSS
+(shared pages split between their users) and USS (pages only it uses) are
+read from /proc/<pid>/smaps_rollup. RSS counts shared pages in full, so
+it barely changes; PSS and USS show what forking after the model is
+loaded saves. Exits non-zero unless prefork PSS per worker falls as
+workers are added and stays below that of independent servers. Linux only.
+
+Run from the repository root: python benchmarks/bench_prefork_memory.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from load_generator import build_query_mix, free_port, start_server, train_model
+from stub_site import StubSite
+
+
+def memory(pid):
+    """RSS, PSS and USS of a process in MiB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'uss': fields['Private_Clean'] + fields['Private_Dirty']
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def warm(url, queries):
+    session = requests.Session()
+    for query in queries:
+        session.post(f"{url}/api/chat", json={'message': query}, timeout=30)
+
+
+def start_prefork(website_url, workdir, workers, timeout=30):
+    port = free_port()
+    env = dict(os.environ, CHATBOT_WEBSITE_URL=website_url)
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'prefork.py'), '--workers', str(workers),
+                                '--host', '127.0.0.1', '--port', str(port), '--server', 'flask'],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if len(children(process.pid)) == workers:
+            try:
+                requests.get(f"{url}/metrics", timeout=1)
+                return process, url
+            except requests.ConnectionError:
+                pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Prefork server did not start")
+
+
+def summarize(samples):
+    count = len(samples)
+    return {key: sum(s[key] for s in samples) / count for key in ('rss', 'pss', 'uss')} | {
+        'total_pss': sum(s['pss'] for s in samples)
+    }
+
+
+def measure_prefork(site, workdir, workers, queries):
+    process, url = start_prefork(site.url, workdir, workers)
+    try:
+        warm(url, queries)
+        samples = [memory(pid) for pid in children(process.pid)]
+        per_worker = summarize(samples)
+        # The master's share counts towards the total, not the per-worker figures
+        per_worker['total_pss'] += memory(process.pid)['pss']
+        return per_worker
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_independent(site, workdir, workers, queries):
+    servers = [start_server(site.url, workdir) for _ in range(workers)]
+    try:
+        for _, url in servers:
+            warm(url, queries[:len(queries) // workers])
+        return summarize([memory(process.pid) for process, _ in servers])
+    finally:
+        for process, _ in servers:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests', type=int, default=100, help="Warm-up chat requests per worker")
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    workdir = tempfile.mkdtemp()
+    train_model(workdir)
+
+    print(f"{'workers':>7}  {'mode':<12} {'RSS/worker':>11} {'PSS/worker':>11} {'USS/worker':>11} {'total PSS':>10}")
+    failures = []
+    previous = None
+    with StubSite() as site:
+        for workers in sorted(args.workers):
+            queries = build_query_mix(training_data, args.requests * workers)
+            results = {}
+            for mode, measure in (('prefork', measure_prefork), ('independent', measure_independent)):
+                result = results[mode] = measure(site, workdir, workers, queries)
+                print(f"{workers:>7}  {mode:<12} {result['rss']:>9.1f}MB {result['pss']:>9.1f}MB "
+                      f"{result['uss']:>9.1f}MB {result['total_pss']:>8.1f}MB")
+
+            pss = results['prefork']['pss']
+            if workers > 1 and pss >= results['independent']['pss']:
+                failures.append(f"{workers} prefork workers use as much PSS each as independent servers")
+            if previous is not None and pss >= previous[1]:
+                failures.append(f"prefork PSS per worker did not fall from {previous[0]} to {workers} workers")
+            previous = (workers, pss)
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
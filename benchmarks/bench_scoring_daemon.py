@@ -0,0 +1,110 @@
+"""Throughput of answering through scoring_daemon.py against scoring in-process.
+
+The same query mix is answered three ways: by SmartChatbot in this
+process from --threads threads (one web worker's view), by the daemon over
+its Unix socket from the same number of threads sending one message each
+(micro-batched by the daemon when they arrive together), and by one
+thread pipelining --pipeline messages per round trip. Both sides start
+with an empty response cache.
+
+Run from the repository root: python benchmarks/bench_scoring_daemon.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_generator import build_query_mix, train_model
+from stub_site import StubSite
+
+
+def run_threads(func, queries, threads):
+    """Call func(query) for every query from threads threads; returns queries per second"""
+    position = iter(range(len(queries)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            func(queries[i])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return len(queries) / (time.perf_counter() - start)
+
+
+def start_daemon(website_url, workdir, path, timeout=30):
+    env = dict(os.environ, CHATBOT_WEBSITE_URL=website_url)
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'scoring_daemon.py'), '--socket', path],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("Scoring daemon did not start")
+        time.sleep(0.05)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--pipeline', type=int, default=64)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        queries = build_query_mix(json.load(f), args.requests)
+    workdir = tempfile.mkdtemp()
+    train_model(workdir)
+    path = os.path.join(workdir, 'scoring.sock')
+
+    with StubSite() as site:
+        os.environ['CHATBOT_WEBSITE_URL'] = site.url
+        os.environ.pop('CHATBOT_SCORING_SOCKET', None)
+        # app loads the model file from the working directory
+        os.chdir(workdir)
+        import app
+        from scoring_client import ScoringClient
+
+        app.chatbot.response_cache.clear()
+        in_process = run_threads(app.chatbot.get_response, queries, args.threads)
+
+        daemon = start_daemon(site.url, workdir, path)
+        try:
+            client = ScoringClient(path)
+            client.answer(['hello'])
+            remote = run_threads(lambda query: client.answer([query]), queries, args.threads)
+            stats = client.stats()
+
+            batches = [queries[i:i + args.pipeline] for i in range(0, len(queries), args.pipeline)]
+            start = time.perf_counter()
+            for batch in batches:
+                client.answer(batch)
+            pipelined = len(queries) / (time.perf_counter() - start)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"{len(queries)} queries, {args.threads} threads")
+    print(f"  in-process SmartChatbot        {in_process:8.0f} queries/s")
+    print(f"  daemon, one message per call   {remote:8.0f} queries/s  (mean daemon batch {stats['mean_batch_size']})")
+    print(f"  daemon, {args.pipeline} pipelined per call {pipelined:8.0f} queries/s")
+
+
+if __name__ == '__main__':
+    main()
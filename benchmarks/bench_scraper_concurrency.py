@@ -0,0 +1,73 @@
+"""WebsiteScraper.scrape_website: sequential vs concurrent crawl.
+
+Serves the five scraped pages from a local server that delays each reply,
+so no network access is needed.
+
+Run from the repository root:  python benchmarks/bench_scraper_concurrency.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from website_scraper import WebsiteScraper
+
+# Per-path delay in seconds; the homepage is the slowest page
+DELAYS = {'/': 0.6, '/courses': 0.4, '/internship': 0.3, '/about': 0.2, '/contact': 0.2}
+
+PAGE = (
+    "<html><head><title>Brainovision</title></head><body>"
+    "<h1>Python Full Stack Development</h1>"
+    "<p>Hands-on training with a three month paid internship for every student.</p>"
+    "<ul><li>Django and Flask frameworks</li><li>REST APIs and deployment</li></ul>"
+    "</body></html>"
+).encode()
+
+
+class DelayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(DELAYS.get(self.path, 0.2))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed_scrape(base_url, concurrent):
+    manifest_file = os.path.join(tempfile.mkdtemp(), 'scrape_manifest.json')
+    scraper = WebsiteScraper(base_url, manifest_file=manifest_file)
+    start = time.perf_counter()
+    data = scraper.scrape_website(concurrent=concurrent)
+    return time.perf_counter() - start, data
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DelayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        sequential, seq_data = timed_scrape(base_url, concurrent=False)
+        concurrent, con_data = timed_scrape(base_url, concurrent=True)
+        assert seq_data == con_data
+    finally:
+        server.shutdown()
+
+    print(f"sum of page delays:  {sum(DELAYS.values()):.2f}s")
+    print(f"slowest single page: {max(DELAYS.values()):.2f}s")
+    print(f"sequential crawl:    {sequential:.2f}s")
+    print(f"concurrent crawl:    {concurrent:.2f}s  ({sequential / concurrent:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Single-query scoring: cosine_similarity + argmax vs the transposed PatternIndex.
+
+Run from the repository root:  python benchmarks/bench_similarity.py
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from bench_model_load import scaled_training_data
+from similarity import PatternIndex
+from training import build_model
+
+
+def per_query(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    print(f"{'patterns':>9} {'cosine+argmax':>14} {'PatternIndex':>13} {'speedup':>8} {'same':>5}")
+    for factor in (1, 10, 100):
+        training_data = scaled_training_data(factor)
+        model_data = build_model(training_data)
+        matrix = model_data['tfidf_matrix']
+        index = PatternIndex(matrix)
+
+        rnd = random.Random(0)
+        patterns = [p for intent in training_data['intents'] for p in intent['patterns']]
+        queries = [model_data['vectorizer'].transform([q]) for q in rnd.sample(patterns, 300)]
+
+        def dense(query):
+            similarities = cosine_similarity(query, matrix)
+            best = np.argmax(similarities)
+            return best, similarities[0, best]
+
+        def sparse(query):
+            best, scores = index.best(query)
+            return best[0], scores[0]
+
+        same = all(dense(q)[0] == sparse(q)[0] for q in queries)
+        old, new = per_query(dense, queries), per_query(sparse, queries)
+        print(f"{matrix.shape[0]:>9} {old * 1e3:>12.3f}ms {new * 1e3:>11.3f}ms {old / new:>7.1f}x {str(same):>5}")
+
+
+if __name__ == '__main__':
+    main()
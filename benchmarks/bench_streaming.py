@@ -0,0 +1,94 @@
+"""Time to first token of POST /api/chat/stream against the full /api/chat reply.
+
+Each query is sent to both endpoints of a local server (Flask and the async
+server in asgi.py, both against the stub site). For the stream the client
+records when the intent event and the first answer chunk arrive; for the
+JSON endpoint, when the whole reply has been read. The page used to add
+another 1-2 s of simulated typing on top of the JSON time.
+
+Run from the repository root: python benchmarks/bench_streaming.py
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import requests
+
+from bench_async_server import start
+from load_generator import build_query_mix, train_model
+from stub_site import StubSite
+
+
+def stream_timings(session, url, message):
+    """Seconds until the intent event, the first chunk and the end of the stream"""
+    start = time.perf_counter()
+    intent_at = first_chunk_at = None
+    buffer = b''
+    with session.post(f"{url}/api/chat/stream", json={'message': message}, stream=True, timeout=30) as response:
+        for data in response.iter_content(chunk_size=None):
+            buffer += data
+            while b'\n\n' in buffer:
+                block, buffer = buffer.split(b'\n\n', 1)
+                event = block.split(b'\n', 1)[0].decode('utf-8')
+                if event == 'event: intent' and intent_at is None:
+                    intent_at = time.perf_counter() - start
+                elif event == 'event: chunk' and first_chunk_at is None:
+                    first_chunk_at = time.perf_counter() - start
+    return intent_at, first_chunk_at, time.perf_counter() - start
+
+
+def json_timing(session, url, message):
+    start = time.perf_counter()
+    session.post(f"{url}/api/chat", json={'message': message}, timeout=30).json()
+    return time.perf_counter() - start
+
+
+def summarize(label, values):
+    values = np.array(values) * 1e3
+    print(f"  {label:<28} p50 {np.percentile(values, 50):7.2f}ms  p95 {np.percentile(values, 95):7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        queries = build_query_mix(json.load(f), args.requests)
+    workdir = tempfile.mkdtemp()
+    train_model(workdir)
+
+    with StubSite() as site:
+        for kind in ('flask', 'asgi'):
+            process, url = start(kind, site.url, workdir)
+            try:
+                session = requests.Session()
+                for query in queries[:20]:
+                    stream_timings(session, url, query)
+                    json_timing(session, url, query)
+                streamed = [stream_timings(session, url, query) for query in queries]
+                full = [json_timing(session, url, query) for query in queries]
+                metrics = session.get(f"{url}/metrics", timeout=5).text
+            finally:
+                process.terminate()
+                process.wait()
+
+            print(f"\n{kind} server, {len(queries)} sequential requests")
+            summarize("stream: intent event", [s[0] for s in streamed])
+            summarize("stream: first chunk (TTFT)", [s[1] for s in streamed])
+            summarize("stream: complete", [s[2] for s in streamed])
+            summarize("/api/chat: complete", full)
+            count = next(line for line in metrics.splitlines()
+                         if line.startswith('chatbot_time_to_first_token_seconds_count'))
+            print(f"  server-side histogram: {count}")
+
+
+if __name__ == '__main__':
+    main()
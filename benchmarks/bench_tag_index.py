@@ -0,0 +1,129 @@
+"""Accuracy vs latency of the tag index settings on the shipped training data.
+
+Queries are the training patterns with one word dropped, labelled with
+their pattern's tag. Accuracy counts a query as
+right when the matched tag (score above the 0.15 chat threshold) is its
+label; agreement is how often a setting picks the same tag as scoring
+every pattern. Latency is per single query, on the shipped data and on a
+copy grown to 100x its size with misspelled near-duplicates of every
+pattern, the way the crawler and the typo variants grow real tags.
+
+Run from the repository root:  python benchmarks/bench_tag_index.py
+"""
+import copy
+import json
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from similarity import build_index
+from training import build_model
+
+THRESHOLD = 0.15
+SETTINGS = [
+    {'mode': 'patterns'},
+    {'mode': 'centroids', 'candidate_tags': 1},
+    {'mode': 'centroids', 'candidate_tags': 2},
+    {'mode': 'centroids', 'candidate_tags': 3},
+    {'mode': 'centroids', 'candidate_tags': 5},
+    {'mode': 'medoids', 'candidate_tags': 1, 'medoids_per_tag': 3},
+    {'mode': 'medoids', 'candidate_tags': 2, 'medoids_per_tag': 3},
+    {'mode': 'medoids', 'candidate_tags': 3, 'medoids_per_tag': 3},
+    {'mode': 'medoids', 'candidate_tags': 2, 'medoids_per_tag': 5},
+]
+
+
+def noisy_queries(training_data, seed=0):
+    rnd = random.Random(seed)
+    queries = []
+    for intent in training_data['intents']:
+        for pattern in intent['patterns']:
+            words = pattern.lower().split()
+            if len(words) > 1:
+                del words[rnd.randrange(len(words))]
+            queries.append((' '.join(words), intent['tag']))
+    return queries
+
+
+def near_duplicate_data(training_data, factor, seed=0):
+    """Every pattern plus factor - 1 copies with a few characters mistyped"""
+    rnd = random.Random(seed)
+    scaled = copy.deepcopy(training_data)
+    for intent in scaled['intents']:
+        extra = []
+        for pattern in intent['patterns']:
+            for _ in range(factor - 1):
+                chars = list(pattern)
+                for _ in range(rnd.randint(1, 3)):
+                    chars[rnd.randrange(len(chars))] = rnd.choice(string.ascii_lowercase)
+                extra.append(''.join(chars))
+        intent['patterns'] = intent['patterns'] + extra
+    return scaled
+
+
+def predict(index, tags, vectors):
+    best_idx, best_scores = index.best(vectors)
+    return [tags[i] if score > THRESHOLD else None for i, score in zip(best_idx, best_scores)]
+
+
+def latency(index, vectors):
+    times = []
+    for row in range(vectors.shape[0]):
+        query = vectors[row]
+        start = time.perf_counter()
+        index.best(query)
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def describe(settings):
+    parts = [settings['mode']]
+    if 'candidate_tags' in settings:
+        parts.append(f"top {settings['candidate_tags']}")
+    if settings['mode'] == 'medoids':
+        parts.append(f"{settings['medoids_per_tag']}/tag")
+    return ', '.join(parts)
+
+
+def main():
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    model_data = build_model(training_data)
+    queries = noisy_queries(training_data)
+    vectors = model_data['vectorizer'].transform([text for text, _ in queries])
+    labels = [tag for _, tag in queries]
+
+    large_data = build_model(near_duplicate_data(training_data, 100))
+    rnd = random.Random(1)
+    large_vectors = large_data['vectorizer'].transform(
+        rnd.sample([text for text, _ in queries], 200))
+
+    exhaustive = None
+    print(f"{len(queries)} queries, {model_data['tfidf_matrix'].shape[0]} / "
+          f"{large_data['tfidf_matrix'].shape[0]} patterns")
+    print(f"{'setting':>24} {'accuracy':>9} {'agreement':>10} {'p50':>9} {'p99':>9} "
+          f"{'p50 100x':>9} {'p99 100x':>9}")
+    for settings in SETTINGS:
+        index = build_index(model_data['tfidf_matrix'], model_data['tags'], **settings)
+        predicted = predict(index, model_data['tags'], vectors)
+        if exhaustive is None:
+            exhaustive = predicted
+        accuracy = np.mean([p == label for p, label in zip(predicted, labels)])
+        agreement = np.mean([p == e for p, e in zip(predicted, exhaustive)])
+        p50, p99 = latency(index, vectors)
+
+        large_index = build_index(large_data['tfidf_matrix'], large_data['tags'], **settings)
+        large_p50, large_p99 = latency(large_index, large_vectors)
+        print(f"{describe(settings):>24} {accuracy:>8.1%} {agreement:>9.1%} "
+              f"{p50 * 1e6:>7.0f}us {p99 * 1e6:>7.0f}us {large_p50 * 1e6:>7.0f}us {large_p99 * 1e6:>7.0f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Upstream fetches made by the page cache against a slow, a failing and a hanging stub site.
+
+Chat handlers read pages with PageContentCache.get(), several threads at
+a time, with a TTL of zero so every read asks for a refresh. The scenarios:
+
+  slow     each page takes 0.2 s; refreshes asked for meanwhile join the
+           fetch in flight instead of starting their own
+  failing  every page is a 503; after three failures the circuit opens
+           and only a trial fetch goes out every reset_timeout
+  hanging  pages never answer within the fetch timeout; same as failing
+  recover  the site comes back; the next trial closes the circuit
+
+Each scenario also runs with the breaker effectively disabled, for
+reference. Page reads must stay fast throughout. Exits with status 1 if
+one of those expectations does not hold.
+
+Run from the repository root: python benchmarks/bench_upstream_breaker.py
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from page_cache import PageContentCache
+from stub_site import StubSite
+
+PATHS = ['/internship', '/courses']
+RESET_TIMEOUT = 0.5
+FETCH_TIMEOUT = 0.5
+
+
+def hammer(cache, seconds, threads=8):
+    """Read every page from threads threads for seconds; returns reads done and the slowest read"""
+    stop = time.monotonic() + seconds
+    reads = []
+    slowest = []
+
+    def reader():
+        count = 0
+        worst = 0.0
+        while time.monotonic() < stop:
+            for url in cache.urls:
+                start = time.perf_counter()
+                cache.get(url)
+                worst = max(worst, time.perf_counter() - start)
+                count += 1
+            time.sleep(0.001)
+        reads.append(count)
+        slowest.append(worst)
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(reads), max(slowest)
+
+
+def scenario(site, delay, failure_rate, seconds, breaker):
+    """(reads, upstream requests, slowest read, final circuit state) of one run against a fresh cache"""
+    cache = PageContentCache(site.url, PATHS, watch_terms=['internship'], ttl=0, timeout=FETCH_TIMEOUT,
+                             failure_threshold=3 if breaker else 10 ** 9, reset_timeout=RESET_TIMEOUT)
+    site.server.delay = delay
+    site.server.failure_rate = failure_rate
+    before = site.server.requests
+    reads, slowest = hammer(cache, seconds)
+    return reads, site.server.requests - before, slowest, cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0, help="Length of each scenario")
+    args = parser.parse_args()
+
+    failures = []
+    with StubSite() as site:
+        print(f"{'scenario':<10} {'breaker':<8} {'page reads':>10} {'upstream':>9} {'slowest read':>13}  circuit")
+        for name, delay, failure_rate in (('slow', 0.2, 0.0), ('failing', 0.0, 1.0), ('hanging', 2.0, 0.0)):
+            for breaker in (False, True):
+                reads, upstream, slowest, cache = scenario(site, delay, failure_rate, args.seconds, breaker)
+                print(f"{name:<10} {'on' if breaker else 'off':<8} {reads:>10} {upstream:>9} "
+                      f"{slowest * 1e3:>11.2f}ms  {cache.breaker.state}")
+                if slowest > 0.1:
+                    failures.append(f"{name}: a page read took {slowest * 1e3:.0f}ms")
+                if name == 'slow' and upstream > len(PATHS) * (args.seconds / delay + 1):
+                    failures.append(f"slow: {upstream} fetches were not coalesced")
+                if name != 'slow' and breaker:
+                    # Three failures to open, then at most one trial per reset_timeout
+                    limit = 3 + len(PATHS) + args.seconds / RESET_TIMEOUT
+                    if upstream > limit:
+                        failures.append(f"{name}: {upstream} upstream requests with the circuit open")
+
+        # Break the site, then bring it back and wait for a trial to close the circuit
+        reads, upstream, slowest, cache = scenario(site, 0.0, 1.0, 1.0, True)
+        site.server.failure_rate = 0.0
+        start = time.monotonic()
+        while cache.breaker.state != 'closed' and time.monotonic() - start < 5:
+            for url in cache.urls:
+                cache.get(url)
+            time.sleep(0.01)
+        recovered = time.monotonic() - start
+        page = cache.get(cache.urls[0])
+        print(f"recover    on       circuit {cache.breaker.state} after {recovered:.2f}s, "
+              f"page status {page.status_code if page else None}")
+        if cache.breaker.state != 'closed' or page is None:
+            failures.append("recover: the circuit did not close after the site came back")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""End-to-end load test: replays a realistic query mix against POST /api/chat.
+
+The mix is drawn from the patterns in website_training_data.json with a
+skewed popularity (a few questions are asked far more often than the rest,
+so the response cache sees realistic repeats) and a share of misspelled
+variants. By default the stub website and a chatbot server trained on the
+same JSON are started in a scratch directory, so nothing touches the
+network; pass --url to load an already running server instead.
+
+Run from the repository root:
+    python benchmarks/load_generator.py [--requests 2000] [--concurrency 8] [--url URL]
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import requests
+
+from stub_site import StubSite
+
+SERVER = r'''
+import sys
+sys.path.insert(0, {root!r})
+import app
+app.app.run(host='127.0.0.1', port={port}, threaded=True)
+'''
+
+
+def build_query_mix(training_data, size, typo_rate=0.2, seed=0):
+    """size queries; pattern popularity follows a Zipf-like 1/rank curve"""
+    rnd = random.Random(seed)
+    patterns = [p for intent in training_data['intents'] for p in intent['patterns']]
+    rnd.shuffle(patterns)
+    weights = [1.0 / rank for rank in range(1, len(patterns) + 1)]
+    queries = []
+    for pattern in rnd.choices(patterns, weights=weights, k=size):
+        if rnd.random() < typo_rate and len(pattern) > 3:
+            i = rnd.randrange(len(pattern))
+            pattern = pattern[:i] + pattern[i + 1:]
+        queries.append(pattern)
+    return queries
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def train_model(workdir):
+    """Fit the model on the shipped training JSON into workdir"""
+    from training import build_model, save_model
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        save_model(build_model(json.load(f)), os.path.join(workdir, 'website_training_data.model'))
+
+
+def start_server(website_url, workdir, timeout=30):
+    """Run app.py's server against website_url; returns (process, base URL) once it answers"""
+    port = free_port()
+    env = dict(os.environ, CHATBOT_WEBSITE_URL=website_url)
+    process = subprocess.Popen([sys.executable, '-c', SERVER.format(root=ROOT, port=port)],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/metrics", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Chatbot server did not start")
+
+
+def run_load(url, queries, concurrency=8, warmup=50):
+    """Send every query with concurrency client threads; returns throughput and latency percentiles"""
+    session = requests.Session()
+    for query in queries[:warmup]:
+        session.post(f"{url}/api/chat", json={'message': query}, timeout=30)
+
+    latencies = []
+    errors = []
+    position = iter(range(len(queries)))
+    lock = threading.Lock()
+
+    def client():
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    i = next(position, None)
+                if i is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = session.post(f"{url}/api/chat", json={'message': queries[i]}, timeout=30)
+                    ok = response.status_code == 200 and response.json().get('status') == 'success'
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        errors.append(i)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': len(queries),
+        'errors': len(errors),
+        'throughput_rps': len(queries) / elapsed,
+        'p50_seconds': float(np.percentile(latencies, 50)),
+        'p95_seconds': float(np.percentile(latencies, 95)),
+        'p99_seconds': float(np.percentile(latencies, 99)),
+        'max_seconds': max(latencies),
+    }
+
+
+def run_local(num_requests=2000, concurrency=8, seed=0):
+    """Stub site + fresh server + load test, all local; returns run_load's results"""
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        queries = build_query_mix(json.load(f), num_requests, seed=seed)
+    workdir = tempfile.mkdtemp()
+    train_model(workdir)
+    with StubSite() as site:
+        process, url = start_server(site.url, workdir)
+        try:
+            return run_load(url, queries, concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def print_results(results):
+    print(f"requests: {results['requests']}  errors: {results['errors']}  "
+          f"throughput: {results['throughput_rps']:.0f} req/s")
+    print(f"latency p50 {results['p50_seconds'] * 1e3:.2f}ms  p95 {results['p95_seconds'] * 1e3:.2f}ms  "
+          f"p99 {results['p99_seconds'] * 1e3:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--url', help="Load this running server instead of starting one")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+            queries = build_query_mix(json.load(f), args.requests, seed=args.seed)
+        results = run_load(args.url.rstrip('/'), queries, args.concurrency)
+    else:
+        results = run_local(args.requests, args.concurrency, args.seed)
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
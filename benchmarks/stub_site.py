@@ -0,0 +1,146 @@
+"""Local stand-in for www.brainovision.in, so benchmarks run offline.
+
+Serves the pages the chatbot and scraper read (/, /courses, /internship,
+/about, /contact and robots.txt) from a background thread. Each reply can
+be delayed to simulate a slow upstream, and a failure_rate share of them
+answered with 503 to simulate a flaky or down one; both can be changed
+while the site runs. With etags set, pages carry an ETag and conditional
+GETs of an unchanged page get a 304. server.requests counts the requests
+received, and server.user_agents counts them by client (python-requests,
+python-httpx, ...).
+
+Run it on its own to point a dev server at it:
+    python benchmarks/stub_site.py 8001
+    CHATBOT_WEBSITE_URL=http://127.0.0.1:8001 python app.py
+"""
+import hashlib
+from collections import Counter
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COURSES = ['Python Full Stack Development', 'Java Full Stack Development',
+           'Artificial Intelligence and Machine Learning', 'Data Science and Analytics',
+           'Cloud Computing', 'DevOps Engineering']
+NAVIGATION = ''.join(f'<a href="{path}">{path.strip("/") or "home"}</a>'
+                     for path in ('/', '/courses', '/internship', '/about', '/contact'))
+
+
+def _page(title, headings, paragraphs, items=()):
+    body = ''.join(f'<h2>{h}</h2>' for h in headings)
+    body += ''.join(f'<p>{p}</p>' for p in paragraphs)
+    if items:
+        body += '<ul>' + ''.join(f'<li>{item}</li>' for item in items) + '</ul>'
+    return (f'<html><head><title>{title}</title></head><body><nav>{NAVIGATION}</nav>'
+            f'<h1>{title}</h1>{body}</body></html>').encode('utf-8')
+
+
+PAGES = {
+    '/': _page('Brainovision Solutions', ['Industry ready technology training'],
+               ['Brainovision Solutions trains students in modern software development.',
+                'Every course includes a three month paid internship with a monthly stipend.']),
+    '/courses': _page('Our Courses', COURSES,
+                      ['Hands-on programs designed with industry experts for career success.'],
+                      [f'{course} with live projects' for course in COURSES]),
+    '/internship': _page('Internship Program', ['Three month paid internship', 'Stipend and certificate'],
+                         ['Our internship places students on real industry projects with mentors.'],
+                         ['Real-world project experience', 'Monthly stipend for every intern']),
+    '/about': _page('About Brainovision', ['Our mission'],
+                    ['A premier technology education institute bridging academia and industry.']),
+    '/contact': _page('Contact Us', ['Get in touch'],
+                      ['Email info@brainovision.in or call us for admissions and course details.']),
+    '/robots.txt': b'User-agent: *\nAllow: /\n',
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.user_agents[self.headers.get('User-Agent', '').split('/')[0]] += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        body = PAGES.get(self.path.split('?')[0])
+        status = 200 if body is not None else 404
+        body = body if body is not None else b'Not found'
+        if self.server.failure_rate and random.random() < self.server.failure_rate:
+            status, body = 503, b'Service unavailable'
+        if self.server.etags and status == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        self.send_response(status)
+        content_type = 'text/plain' if self.path.endswith('.txt') or status != 200 else 'text/html; charset=utf-8'
+        self.send_header('Content-Type', content_type)
+        if self.server.etags and status == 200:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # A slow page outlived the client, e.g. a server stopped mid-fetch
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class StubSite:
+    """The stub site on 127.0.0.1, serving until stop() or the end of a with block"""
+    def __init__(self, port=0, delay=0.0, failure_rate=0.0, etags=False):
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.server.failure_rate = failure_rate
+        self.server.etags = etags
+        self.server.requests = 0
+        self.server.user_agents = Counter()
+        self.server.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def point_app_at_stub():
+    """Start a stub site for the rest of the process and point app.py at it.
+
+    Importing app starts the page cache, so call this before the import to
+    keep the benchmark off the real site.
+    """
+    site = StubSite().start()
+    os.environ['CHATBOT_WEBSITE_URL'] = site.url
+    return site
+
+
+if __name__ == '__main__':
+    site = StubSite(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8001).start()
+    print(f"🌐 Stub website at {site.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,146 @@
+"""Benchmark suite: micro-benchmarks, an optional load test, and regression checks.
+
+Micro-benchmarks time single operations on the shipped training data:
+spelling correction and keyword intent detection with cold caches, TF-IDF
+scoring of one query, WebsiteScraper.scrape_page against the local stub
+site, and loading the model file. --load adds the end-to-end load test
+from load_generator.py. Everything runs offline.
+
+Results are seconds per operation (and requests per second for the load
+test). --save-baseline writes them to a JSON file; --compare checks a run
+against one and exits with status 1 if any result is worse than the
+baseline by more than --tolerance. Baselines are machine specific, so
+record one on the machine that runs the comparison.
+
+Run from the repository root:
+    python benchmarks/suite.py [--load] [--save-baseline FILE | --compare FILE]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_generator import build_query_mix, run_local
+from stub_site import StubSite, point_app_at_stub
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def time_per_op(func, items, repeat=5):
+    """Median over repeat runs of the mean time of func(item) across items"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        runs.append((time.perf_counter() - start) / len(items))
+    return statistics.median(runs)
+
+
+def micro_benchmarks():
+    point_app_at_stub()
+    from app import QueryAnalysis, SmartChatbot
+    from model_store import load_model_file
+    from page_cache import PageContentCache
+    from response_cache import ResponseCache
+    from training import build_model, save_model
+    from website_scraper import WebsiteScraper
+
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    queries = build_query_mix(training_data, 300, typo_rate=0.5)
+    workdir = tempfile.mkdtemp()
+    model_file = os.path.join(workdir, 'website_training_data.model')
+    save_model(build_model(training_data), model_file)
+
+    bot = SmartChatbot(page_cache=PageContentCache('http://127.0.0.1:9', []),
+                       model_data=load_model_file(model_file), response_cache=ResponseCache(max_size=0))
+    corrector = bot.spelling_corrector
+    scorer = bot.keyword_scorer
+
+    def correct(query):
+        corrector._cache.clear()
+        bot.correct_spelling(query.lower())
+
+    def detect(query):
+        scorer._word_cache.clear()
+        bot.detect_intent_from_keywords(query.lower())
+
+    def score(query):
+        bot._match_model_tags([QueryAnalysis(query, query, None)])
+
+    results = {
+        'correct_spelling_seconds': time_per_op(correct, queries),
+        'detect_intent_seconds': time_per_op(detect, queries),
+        'tfidf_score_seconds': time_per_op(score, queries),
+        'model_load_seconds': time_per_op(load_model_file, [model_file] * 20),
+    }
+
+    with StubSite() as site:
+        scraper = WebsiteScraper(site.url, manifest_file=os.path.join(workdir, 'manifest.json'))
+        urls = [f"{site.url}{path}" for path in ('/', '/courses', '/internship', '/about', '/contact')] * 4
+        results['scrape_page_seconds'] = time_per_op(scraper.scrape_page, urls)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print each result against the baseline; False if any got worse than tolerance allows"""
+    ok = True
+    print(f"{'benchmark':>26} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in results.items():
+        if name not in baseline:
+            print(f"{name:>26} {'-':>12} {value:>12.6g} {'new':>8}")
+            continue
+        base = baseline[name]
+        # Throughput should go up; every other result is a time and should go down
+        change = (base - value) / base if name.endswith('_rps') else (value - base) / base
+        regressed = change > tolerance
+        ok = ok and not regressed
+        print(f"{name:>26} {base:>12.6g} {value:>12.6g} {change:>+7.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--load', action='store_true', help="Also run the end-to-end load test")
+    parser.add_argument('--requests', type=int, default=2000, help="Requests sent by the load test")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads in the load test")
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, metavar='FILE')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='FILE')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="Allowed slowdown before a result counts as a regression (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    # The chatbot logs model loading and page fetches; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = micro_benchmarks()
+    if args.load:
+        load = run_local(args.requests, args.concurrency)
+        results.update({f'load_{name}': value for name, value in load.items()
+                        if name.endswith(('_seconds', '_rps'))})
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+        return
+
+    for name, value in results.items():
+        print(f"{name:>26} {value * 1e6:>10.1f}us" if name.endswith('_seconds') else f"{name:>26} {value:>10.1f}")
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.save_baseline}")
+
+
+if __name__ == '__main__':
+    main()
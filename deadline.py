@@ -0,0 +1,16 @@
+import math
+import time
+
+
+class Deadline:
+    """Time budget of one request; pipeline stages check it before doing optional work"""
+    def __init__(self, seconds=math.inf):
+        self.seconds = seconds
+        self.expires_at = time.perf_counter() + seconds
+
+    def remaining(self):
+        """Seconds left, never below zero"""
+        return max(0.0, self.expires_at - time.perf_counter())
+
+    def expired(self):
+        return time.perf_counter() >= self.expires_at
@@ -1,23 +1,22 @@
 import re
 import random
-import nltk
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from .similarity import PatternIndex
 
-# Download NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+NLTK_RESOURCES = {'punkt': 'tokenizers/punkt', 'wordnet': 'corpora/wordnet'}
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
+def download_nltk_data():
+    """Fetch the NLTK resources the chatbot may use; run once at setup, never on import"""
+    import nltk
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(name)
 
 class AcademicChatbot:
     def __init__(self):
+        # Fitting needs scikit-learn, so it is only imported once a bot is built
+        from sklearn.feature_extraction.text import TfidfVectorizer
         self.vectorizer = TfidfVectorizer()
         self.setup_knowledge_base()
     
@@ -40,6 +39,7 @@ class AcademicChatbot:
         # Train TF-IDF vectorizer
         if self.patterns:
             self.tfidf_matrix = self.vectorizer.fit_transform(self.patterns)
+            self.pattern_index = PatternIndex(self.tfidf_matrix)
     
     def preprocess_text(self, text):
         """Clean and preprocess input text"""
@@ -72,9 +72,8 @@ class AcademicChatbot:
         # Find best matching intent using cosine similarity
         if hasattr(self, 'tfidf_matrix') and self.patterns:
             user_vec = self.vectorizer.transform([user_input])
-            similarities = cosine_similarity(user_vec, self.tfidf_matrix)
-            best_match_idx = np.argmax(similarities)
-            best_score = similarities[0, best_match_idx]
+            best_match_idx, best_scores = self.pattern_index.best(user_vec)
+            best_match_idx, best_score = best_match_idx[0], best_scores[0]
             
             if best_score > 0.3:
                 return random.choice(self.responses[best_match_idx])
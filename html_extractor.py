@@ -0,0 +1,212 @@
+import codecs
+from html.parser import HTMLParser
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+SKIPPED_ELEMENTS = {'script', 'style'}
+HEADING_ELEMENTS = {'h1', 'h2', 'h3'}
+LIST_ELEMENTS = {'ul', 'ol'}
+PRESERVE_WHITESPACE_ELEMENTS = {'pre', 'textarea'}
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class _Capture:
+    """Text collected for one open element of interest"""
+    def __init__(self, kind, ref=None):
+        self.kind = kind
+        self.ref = ref
+        self.parts = []
+
+
+class StreamingExtractor(HTMLParser):
+    """Single-pass page extractor fed incrementally with HTML text.
+
+    Produces the same records as WebsiteScraper.extract_content: the page
+    title, h1-h3 headings, paragraphs and the li items of every ul/ol (each
+    list reports all of its descendant items, so nested items are repeated
+    for every enclosing list). Only the text of elements still open is kept
+    in memory.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.skip_depth = 0
+        self.preserve_depth = 0
+        self.pending = []
+        self.closed_void_elements = []
+        self.list_count = 0
+
+        self.links = []
+        self.title = None
+        self.headings = []
+        self.paragraphs = []
+        self.list_items = {}
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag == 'a':
+            self._collect_link(attrs)
+        if tag in VOID_ELEMENTS:
+            # A later </tag> for this element is redundant and ignored
+            self.closed_void_elements.append(tag)
+            return
+
+        capture = None
+        if tag == 'title' and self.title is None and not self._capturing('title'):
+            capture = _Capture('title')
+        elif tag in HEADING_ELEMENTS:
+            capture = _Capture('heading')
+        elif tag == 'p':
+            capture = _Capture('paragraph')
+        elif tag in LIST_ELEMENTS:
+            capture = _Capture('list', self.list_count)
+            self.list_items[self.list_count] = []
+            self.list_count += 1
+        elif tag == 'li':
+            lists = self._open_lists()
+            if lists:
+                capture = _Capture('item', lists)
+                # Reserve the item's slot now so items stay in document order
+                for list_id in lists:
+                    self.list_items[list_id].append(capture)
+
+        if tag in SKIPPED_ELEMENTS:
+            self.skip_depth += 1
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_depth += 1
+        if capture and capture.kind == 'title':
+            self.title = capture
+        elif capture and capture.kind == 'heading':
+            self.headings.append(capture)
+        elif capture and capture.kind == 'paragraph':
+            self.paragraphs.append(capture)
+        self.stack.append((tag, capture))
+
+    def handle_startendtag(self, tag, attrs):
+        # <tag/> opens and closes an element with no text in it
+        self._flush()
+        if tag == 'a':
+            self._collect_link(attrs)
+        if tag == 'title' and self.title is None:
+            self.title = _Capture('title')
+        elif tag in HEADING_ELEMENTS:
+            self.headings.append(_Capture('heading'))
+        elif tag == 'p':
+            self.paragraphs.append(_Capture('paragraph'))
+        elif tag in LIST_ELEMENTS:
+            self.list_items[self.list_count] = []
+            self.list_count += 1
+        elif tag == 'li':
+            lists = self._open_lists()
+            for list_id in lists:
+                self.list_items[list_id].append(_Capture('item', lists))
+
+    def handle_endtag(self, tag):
+        # Close the most recent matching element, like the tree builder does;
+        # stray end tags with no open element are ignored
+        if tag in self.closed_void_elements:
+            self.closed_void_elements.remove(tag)
+            return
+        self._flush()
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                break
+        else:
+            return
+
+        while len(self.stack) > depth:
+            closed, _ = self.stack.pop()
+            if closed in SKIPPED_ELEMENTS:
+                self.skip_depth -= 1
+            if closed in PRESERVE_WHITESPACE_ELEMENTS:
+                self.preserve_depth -= 1
+
+    def handle_data(self, data):
+        # Text may arrive in several pieces; it is one string up to the next tag
+        self.pending.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        """Hand the text seen since the last tag to every open capture"""
+        if not self.pending:
+            return
+        data = ''.join(self.pending)
+        self.pending = []
+        if self.skip_depth:
+            return
+
+        # Whitespace-only strings collapse to one character, as in BeautifulSoup
+        if not data.translate({ord(ch): None for ch in ASCII_SPACES}) and not self.preserve_depth:
+            data = '\n' if '\n' in data else ' '
+
+        for _, capture in self.stack:
+            if capture and capture.kind != 'list':
+                capture.parts.append(data)
+
+    def _collect_link(self, attrs):
+        href = dict(attrs).get('href')
+        if href:
+            self.links.append(href)
+
+    def _capturing(self, kind):
+        return any(c and c.kind == kind for _, c in self.stack)
+
+    def _open_lists(self):
+        return tuple(c.ref for _, c in self.stack if c and c.kind == 'list')
+
+    def records(self):
+        """Return the extracted records in extract_content's format"""
+        content = []
+
+        if self.title is not None:
+            content.append(f"Page Title: {''.join(self.title.parts).strip()}")
+
+        for heading in self.headings:
+            text = ''.join(heading.parts).strip()
+            if text and len(text) > 5:
+                content.append(f"Heading: {text}")
+
+        for paragraph in self.paragraphs:
+            text = ''.join(paragraph.parts).strip()
+            if text and len(text) > 20:
+                content.append(text)
+
+        for list_id in range(self.list_count):
+            for item in self.list_items[list_id]:
+                text = ''.join(item.parts).strip()
+                if text and len(text) > 10:
+                    content.append(f"• {text}")
+
+        return content
+
+
+def extract_stream(chunks, encoding='utf-8', links=None):
+    """Extract page records from an iterable of HTML byte chunks in one pass.
+
+    If a links list is given, the href of every <a> is appended to it.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parser = StreamingExtractor()
+    for chunk in chunks:
+        if chunk:
+            parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    if links is not None:
+        links.extend(parser.links)
+    return parser.records()
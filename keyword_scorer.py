@@ -0,0 +1,130 @@
+from collections import deque
+import numpy as np
+from scipy.sparse import csr_matrix
+from spelling import FuzzyIndex
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton reporting every phrase occurring as a substring"""
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+
+        for idx, phrase in enumerate(phrases):
+            state = 0
+            for ch in phrase:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].add(idx)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] |= self.output[self.fail[nxt]]
+
+    def find(self, text):
+        """Return the set of phrase indices found anywhere in text"""
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            if self.output[state]:
+                found |= self.output[state]
+        return found
+
+
+class KeywordIntentScorer:
+    """Keyword intent scoring compiled once from keyword_groups.
+
+    Each keyword is worth 2 points when it occurs in the text, otherwise 1
+    point for every word longer than 3 characters that is more than 80%
+    similar to one of its tokens. Keyword values are gathered into a vector
+    and summed per intent with one sparse keyword->intent product.
+    """
+
+    def __init__(self, keyword_groups, similarity_threshold=0.8, min_word_length=4,
+                 cache_size=10000):
+        self.intents = list(keyword_groups)
+        self.min_word_length = min_word_length
+        self.cache_size = cache_size
+
+        self.keywords = []
+        keyword_ids = {}
+        rows, cols = [], []
+        for col, intent in enumerate(self.intents):
+            for keyword in keyword_groups[intent]:
+                if keyword not in keyword_ids:
+                    keyword_ids[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                rows.append(col)
+                cols.append(keyword_ids[keyword])
+
+        # Duplicate (intent, keyword) pairs add up, as they did in the loops
+        self.intent_matrix = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self.intents), len(self.keywords))
+        )
+        self.phrase_matcher = PhraseMatcher(self.keywords)
+
+        tokens = sorted({kw for keyword in self.keywords for kw in keyword.split()})
+        self.token_keywords = [
+            [idx for idx, keyword in enumerate(self.keywords) if token in keyword.split()]
+            for token in tokens
+        ]
+        self.token_index = FuzzyIndex(tokens, similarity_threshold)
+        self._word_cache = {}
+
+    def _fuzzy_keywords(self, word):
+        """Keyword indices with a token similar to word"""
+        cached = self._word_cache.get(word)
+        if cached is not None:
+            return cached
+
+        keywords = set()
+        for idx, _ in self.token_index.matches(word):
+            keywords.update(self.token_keywords[idx])
+        keywords = frozenset(keywords)
+
+        if len(self._word_cache) >= self.cache_size:
+            self._word_cache.clear()
+        self._word_cache[word] = keywords
+        return keywords
+
+    def score(self, text):
+        """Return {intent: score} for every intent scoring above zero"""
+        text_lower = text.lower()
+        values = np.zeros(len(self.keywords))
+
+        for word in text_lower.split():
+            if len(word) >= self.min_word_length:
+                for idx in self._fuzzy_keywords(word):
+                    values[idx] += 1
+
+        # An exact phrase hit replaces the fuzzy count for that keyword
+        present = list(self.phrase_matcher.find(text_lower))
+        values[present] = 2
+
+        scores = self.intent_matrix @ values
+        return {self.intents[i]: int(scores[i]) for i in np.flatnonzero(scores > 0)}
+
+    def detect(self, text):
+        """Return (intent, score) for the best intent, or (None, 0)"""
+        scores = self.score(text)
+        if not scores:
+            return None, 0
+        best_intent = max(scores.items(), key=lambda x: x[1])
+        return best_intent
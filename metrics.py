@@ -0,0 +1,174 @@
+import bisect
+import math
+import threading
+
+# Latency buckets in seconds, from 50us (cached answers) up to 10s (upstream fetches)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = True
+
+
+def set_enabled(enabled):
+    """Turn recording on or off everywhere; /metrics keeps serving the last values"""
+    global _enabled
+    _enabled = enabled
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, _format_labels(self.labelnames, labels), value)
+                for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        if not _enabled:
+            return
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # One slot per bucket plus +Inf, then the running sum
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[position] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        samples = []
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), values):
+                cumulative += count
+                samples.append((f'{self.name}_bucket',
+                                _format_labels(self.labelnames, labels, [('le', _format_value(bound))]),
+                                cumulative))
+            samples.append((f'{self.name}_sum', _format_labels(self.labelnames, labels), values[-1]))
+            samples.append((f'{self.name}_count', _format_labels(self.labelnames, labels), cumulative))
+        return samples
+
+
+class CallbackMetric:
+    """Values read at scrape time from func(), which returns {label values: value}"""
+
+    def __init__(self, name, help_text, kind, func, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.func = func
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        return [(self.name, _format_labels(self.labelnames, labels), value)
+                for labels, value in sorted(self.func().items())]
+
+
+class Registry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add metric, replacing any earlier one with the same name"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, kind, func, labelnames=()):
+        return self.register(CallbackMetric(name, help_text, kind, func, labelnames))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'chatbot_stage_seconds',
+    'Time spent in each stage of answering; tfidf covers every uncached message of a batch at once',
+    ['stage'])
+REQUEST_SECONDS = REGISTRY.histogram(
+    'chatbot_request_seconds', 'Time to handle a chat API request', ['endpoint'])
+ANSWERS = REGISTRY.counter(
+    'chatbot_answers_total', 'Answers by the stage that produced them and the matched intent or tag',
+    ['stage', 'intent'])
+UPSTREAM_FETCH_SECONDS = REGISTRY.histogram(
+    'chatbot_upstream_fetch_seconds', 'Duration of background website fetches', ['url', 'outcome'])
+UPSTREAM_SKIPPED = REGISTRY.counter(
+    'chatbot_upstream_fetches_skipped_total',
+    'Website refreshes not started: coalesced into the fetch already in flight, or refused by the open circuit',
+    ['reason'])
+UPSTREAM_CIRCUIT_TRANSITIONS = REGISTRY.counter(
+    'chatbot_upstream_circuit_transitions_total', 'Website circuit breaker state changes, by new state', ['state'])
+PAGE_CACHE_LOOKUPS = REGISTRY.counter(
+    'chatbot_page_cache_lookups_total', 'Website page cache lookups by result', ['result'])
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    'chatbot_time_to_first_token_seconds',
+    'Time from receiving a streamed chat request to sending the first piece of its answer', ['endpoint'])
+STAGES_SKIPPED = REGISTRY.counter(
+    'chatbot_stages_skipped_total', 'Matching stages left out of a message because its deadline ran short',
+    ['stage'])
+QUERIES_TRUNCATED = REGISTRY.counter(
+    'chatbot_queries_truncated_total', 'Messages cut to the first max_tokens words before matching')
@@ -0,0 +1,249 @@
+import json
+import os
+import struct
+import tempfile
+import numpy as np
+from scipy.sparse import csr_matrix
+from query_vectorizer import TfidfQueryVectorizer
+
+# File layout: MAGIC, a little-endian uint32 format version, a uint64 header
+# length, the JSON header, then every array at a 64-byte aligned offset so it
+# can be memory-mapped in place.
+MAGIC = b'BVCM'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<4sIQ')
+
+REQUIRED_ARRAYS = ('idf', 'vocab_blob', 'vocab_offsets', 'data', 'indices', 'indptr', 'tag_ids',
+                   'term_data', 'term_indices', 'term_indptr')
+REQUIRED_HEADER_KEYS = ('version', 'vectorizer', 'stop_words', 'shape', 'tags', 'responses', 'arrays')
+VECTORIZER_PARAMS = (
+    'analyzer', 'binary', 'lowercase', 'max_df', 'max_features', 'min_df',
+    'ngram_range', 'norm', 'smooth_idf', 'stop_words', 'strip_accents',
+    'sublinear_tf', 'token_pattern', 'use_idf'
+)
+
+
+class ModelFormatError(ValueError):
+    """The model file is missing pieces, corrupt or from another format version"""
+
+
+class TagColumn:
+    """Per-row tag names stored as integer codes into a small name table"""
+    def __init__(self, names, codes):
+        self.names = names
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.names[self.codes[index]]
+
+    def __iter__(self):
+        return (self.names[code] for code in self.codes)
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_model_file(model_data, filename):
+    """Write model_data in the versioned, memory-mappable model format"""
+    vectorizer = model_data['vectorizer']
+    params = vectorizer.get_params()
+    if params['analyzer'] not in ('word', 'char', 'char_wb') or params['tokenizer'] or params['preprocessor']:
+        raise ModelFormatError("Only vectorizers with built-in analyzers can be stored")
+
+    # Vocabulary as one UTF-8 blob plus term boundaries, ordered by column
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    encoded = [term.encode('utf-8') for term in terms]
+    vocab_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    vocab_offsets[1:] = np.cumsum([len(term) for term in encoded])
+
+    tag_names = list(dict.fromkeys(model_data['tags']))
+    tag_codes = {tag: code for code, tag in enumerate(tag_names)}
+    matrix = csr_matrix(model_data['tfidf_matrix'])
+    # The transposed (terms x patterns) matrix the similarity index scores
+    # with, stored too so every process maps it instead of building a copy
+    term_matrix = csr_matrix(matrix.T)
+    term_matrix.sort_indices()
+
+    arrays = {
+        'idf': np.asarray(vectorizer.idf_, dtype=np.float64),
+        'vocab_blob': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+        'vocab_offsets': vocab_offsets,
+        'data': matrix.data,
+        'indices': matrix.indices,
+        'indptr': matrix.indptr,
+        'tag_ids': np.array([tag_codes[tag] for tag in model_data['tags']], dtype=np.int32),
+        'term_data': term_matrix.data,
+        'term_indices': term_matrix.indices,
+        'term_indptr': term_matrix.indptr
+    }
+
+    vectorizer_params = {name: params[name] for name in VECTORIZER_PARAMS}
+    vectorizer_params['dtype'] = np.dtype(params['dtype']).name
+    # The resolved list, so loading never needs scikit-learn's built-in lists
+    stop_words = vectorizer.get_stop_words()
+    header = {
+        'format': 'brainovision-chatbot-model',
+        'version': FORMAT_VERSION,
+        'vectorizer': vectorizer_params,
+        'stop_words': sorted(stop_words) if stop_words is not None else None,
+        'shape': list(matrix.shape),
+        'tags': tag_names,
+        'responses': model_data['responses'],
+        'arrays': {}
+    }
+
+    # Offsets depend on the header length, so lay the arrays out after a
+    # first pass at the header and grow the reserved space until it fits
+    reserved = ALIGNMENT
+    while True:
+        offset = _align(PREAMBLE.size + reserved)
+        for name, array in arrays.items():
+            header['arrays'][name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset
+            }
+            offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode('utf-8')
+        if len(header_bytes) <= reserved:
+            break
+        reserved = _align(len(header_bytes))
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, array in arrays.items():
+                f.seek(header['arrays'][name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _read_header(filename):
+    with open(filename, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ModelFormatError(f"{filename} is truncated")
+        magic, version, header_length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ModelFormatError(f"{filename} is not a chatbot model file")
+        if version != FORMAT_VERSION:
+            raise ModelFormatError(f"{filename} has format version {version}, expected {FORMAT_VERSION}")
+        try:
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        except ValueError as e:
+            raise ModelFormatError(f"{filename} has a corrupt header: {e}")
+    if not isinstance(header, dict) or header.get('format') != 'brainovision-chatbot-model':
+        raise ModelFormatError(f"{filename} is not a chatbot model file")
+    _check_header(filename, header)
+    return header
+
+
+def _check_header(filename, header):
+    """Make sure the header has every field the loader reads, with usable values"""
+    missing = [key for key in REQUIRED_HEADER_KEYS if key not in header]
+    missing += [f"vectorizer.{key}" for key in VECTORIZER_PARAMS
+                if isinstance(header.get('vectorizer'), dict) and key not in header['vectorizer']]
+    if missing:
+        raise ModelFormatError(f"{filename} header is missing: {', '.join(missing)}")
+    try:
+        rows, cols = header['shape']
+        for spec in header['arrays'].values():
+            np.dtype(spec['dtype'])
+            int(spec['offset'])
+            [int(n) for n in spec['shape']]
+        set(header['tags'])
+        dict(header['responses'])
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ModelFormatError(f"{filename} has a malformed header: {e!r}")
+    # The resolved list (or null), never a name like 'english'
+    if header['stop_words'] is not None and not isinstance(header['stop_words'], list):
+        raise ModelFormatError(f"{filename} has a malformed header: stop_words is not a list")
+
+
+def _check_schema(filename, header, arrays):
+    """Make sure every piece of the model agrees on its shape"""
+    missing = [name for name in REQUIRED_ARRAYS if name not in arrays]
+    if missing:
+        raise ModelFormatError(f"{filename} is missing arrays: {', '.join(missing)}")
+
+    rows, cols = header['shape']
+    checks = [
+        (len(arrays['idf']) == cols, "idf length does not match the vocabulary size"),
+        (len(arrays['vocab_offsets']) == cols + 1, "vocabulary offsets do not match the vocabulary size"),
+        (len(arrays['indptr']) == rows + 1, "indptr does not match the number of patterns"),
+        (len(arrays['tag_ids']) == rows, "tag ids do not match the number of patterns"),
+        (len(arrays['data']) == len(arrays['indices']), "data and indices differ in length"),
+        (len(arrays['term_indptr']) == cols + 1, "term indptr does not match the vocabulary size"),
+        (len(arrays['term_data']) == len(arrays['term_indices']) == len(arrays['data']),
+         "the transposed matrix differs from the pattern matrix in length"),
+        (set(header['tags']) <= set(header['responses']), "some tags have no responses")
+    ]
+    for ok, message in checks:
+        if not ok:
+            raise ModelFormatError(f"{filename}: {message}")
+
+
+def load_model_file(filename):
+    """Load a model file, memory-mapping its arrays read-only.
+
+    Returns the same dict SmartChatbot used to unpickle: vectorizer (a
+    transform-only TfidfQueryVectorizer), tfidf_matrix, tags and responses,
+    plus term_patterns, the transposed matrix for the similarity index.
+    """
+    header = _read_header(filename)
+    size = os.path.getsize(filename)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        if spec['offset'] + count * dtype.itemsize > size:
+            raise ModelFormatError(f"{filename} is truncated")
+        if count == 0:
+            arrays[name] = np.zeros(spec['shape'], dtype=dtype)
+        else:
+            # Pages are shared by every process that maps the same file
+            arrays[name] = np.memmap(filename, dtype=dtype, mode='r',
+                                     offset=spec['offset'], shape=tuple(spec['shape']))
+    _check_schema(filename, header, arrays)
+
+    raw = bytes(arrays['vocab_blob'])
+    offsets = arrays['vocab_offsets'].tolist()
+    # Offsets count bytes, so only an ASCII blob can be sliced after decoding
+    if raw.isascii():
+        text = raw.decode('ascii')
+        terms = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    else:
+        terms = [raw[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    vocabulary = {term: idx for idx, term in enumerate(terms)}
+    vectorizer = TfidfQueryVectorizer(vocabulary, arrays['idf'], header['vectorizer'], header['stop_words'])
+
+    tfidf_matrix = csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(header['shape']), copy=False
+    )
+    term_patterns = csr_matrix(
+        (arrays['term_data'], arrays['term_indices'], arrays['term_indptr']),
+        shape=tuple(reversed(header['shape'])), copy=False
+    )
+
+    return {
+        'vectorizer': vectorizer,
+        'tfidf_matrix': tfidf_matrix,
+        'term_patterns': term_patterns,
+        'tags': TagColumn(header['tags'], arrays['tag_ids']),
+        'responses': header['responses'],
+        'format_version': header['version']
+    }
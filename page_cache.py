@@ -0,0 +1,221 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from circuit_breaker import CircuitBreaker
+from logging_config import get_logger
+from metrics import PAGE_CACHE_LOOKUPS, UPSTREAM_CIRCUIT_TRANSITIONS, UPSTREAM_FETCH_SECONDS, UPSTREAM_SKIPPED
+
+logger = get_logger('page_cache')
+
+
+class PageSnapshot:
+    """Parsed content of one website page, as stored in the cache"""
+    def __init__(self, status_code, headings, mentions, fetched_at):
+        self.status_code = status_code
+        self.headings = headings
+        self.mentions = mentions
+        self.fetched_at = fetched_at
+
+
+class PageContentCache:
+    """Website page store refreshed in the background, read by chat handlers.
+
+    get() never touches the network: it returns whatever snapshot is cached
+    (fresh or stale) and, when the entry is missing or older than ttl, queues
+    a background refresh. Snapshots older than max_stale are not served.
+
+    Each URL has at most one fetch in flight; refreshes requested meanwhile
+    join it. After failure_threshold failed fetches in a row (errors and 5xx
+    replies) the circuit opens and no fetch is started for reset_timeout
+    seconds, so a site that is down costs nothing while pages are served
+    from the cache or the static fallbacks.
+    """
+
+    def __init__(self, base_url, paths, watch_terms=(), ttl=300, max_stale=86400,
+                 timeout=10, max_headings=50, max_workers=2, failure_threshold=3, reset_timeout=30):
+        self.base_url = base_url
+        self.urls = [f"{base_url}{path}" for path in paths]
+        self.watch_terms = tuple(watch_terms)
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self.max_headings = max_headings
+        self.max_workers = max_workers
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout, on_change=self._circuit_changed)
+
+        self._session = None
+        self._pages = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='page-cache')
+        self._stop = threading.Event()
+        self._refresher = None
+        self._loop = None
+        self._client = None
+        self._parse_executor = None
+
+    @property
+    def session(self):
+        """HTTP session, created on the first refresh so importing stays cheap"""
+        if self._session is None:
+            # Imported outside the lock, which get() also takes
+            import requests
+            with self._lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+
+    def start(self):
+        """Warm every page and keep refreshing them every ttl seconds"""
+        if self._refresher is not None or not self.urls:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop,
+                                           name='page-cache-refresher', daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def before_fork(self):
+        """Stop every background thread, so none holds a lock when the process forks"""
+        self.stop()
+        self._executor.shutdown(wait=True)
+
+    def after_fork(self):
+        """Give a forked child its own lock, worker threads and HTTP session; start() again after"""
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._session = None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='page-cache')
+        self._stop = threading.Event()
+        self._refresher = None
+        # The parent's event loop does not run in the child
+        self.detach()
+
+    def attach(self, loop, client, parse_executor=None):
+        """Fetch on loop with a shared async HTTP client instead of worker threads"""
+        self._loop = loop
+        self._client = client
+        self._parse_executor = parse_executor
+
+    def detach(self):
+        """Go back to fetching with the blocking session on worker threads"""
+        self._loop = None
+        self._client = None
+        self._parse_executor = None
+
+    def _refresh_loop(self):
+        while True:
+            for url in self.urls:
+                self.schedule_refresh(url)
+            if self._stop.wait(self.ttl):
+                break
+
+    def get(self, url):
+        """Return the cached snapshot for url, or None if nothing usable is cached"""
+        page = self._pages.get(url)
+        age = time.time() - page.fetched_at if page else None
+
+        if page is None or age > self.ttl:
+            self.schedule_refresh(url)
+        if page is None or age > self.max_stale:
+            PAGE_CACHE_LOOKUPS.inc('missing' if page is None else 'expired')
+            return None
+        PAGE_CACHE_LOOKUPS.inc('fresh' if age <= self.ttl else 'stale')
+        return page
+
+    def schedule_refresh(self, url):
+        """Queue a background fetch of url unless one is already in flight"""
+        with self._lock:
+            if url in self._pending:
+                UPSTREAM_SKIPPED.inc('coalesced')
+                return
+            if not self.breaker.allow():
+                UPSTREAM_SKIPPED.inc('circuit_open')
+                return
+            self._pending.add(url)
+        loop = self._loop
+        if loop is not None:
+            import asyncio
+            try:
+                asyncio.run_coroutine_threadsafe(self.refresh_async(url), loop)
+                return
+            except RuntimeError:
+                # The loop closed before detach(); fetch on a worker thread
+                pass
+        self._executor.submit(self.refresh, url)
+
+    def refresh(self, url):
+        """Fetch and parse url now, keeping the previous snapshot on failure"""
+        try:
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except Exception:
+                UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - start, url, 'error')
+                self.breaker.record_failure()
+                raise
+            UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - start, url, str(response.status_code))
+            if self._record_status(url, response.status_code):
+                self._pages[url] = self.parse(response.status_code, response.content)
+        except Exception as e:
+            logger.warning("Error refreshing %s: %s", url, e)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    async def refresh_async(self, url):
+        """refresh() for an attached loop: the fetch is awaited, parsing runs off the loop"""
+        import asyncio
+        try:
+            start = time.perf_counter()
+            try:
+                response = await self._client.get(url, timeout=self.timeout)
+            except Exception:
+                UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - start, url, 'error')
+                self.breaker.record_failure()
+                raise
+            UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - start, url, str(response.status_code))
+            if self._record_status(url, response.status_code):
+                loop = asyncio.get_running_loop()
+                self._pages[url] = await loop.run_in_executor(self._parse_executor, self.parse,
+                                                              response.status_code, response.content)
+        except Exception as e:
+            logger.warning("Error refreshing %s: %s", url, e)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _record_status(self, url, status_code):
+        """Feed a reply to the circuit breaker; False for server errors, whose page is not kept"""
+        if status_code >= 500:
+            self.breaker.record_failure()
+            logger.warning("Error refreshing %s: HTTP %d", url, status_code)
+            return False
+        self.breaker.record_success()
+        return True
+
+    def _circuit_changed(self, state):
+        UPSTREAM_CIRCUIT_TRANSITIONS.inc(state)
+        log = logger.info if state == 'closed' else logger.warning
+        log("🔌 Website circuit %s for %s", state.replace('_', '-'), self.base_url)
+
+    def parse(self, status_code, content):
+        """Reduce a page to its headings and the watched terms it mentions"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(content, 'html.parser')
+
+        headings = []
+        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4'], limit=self.max_headings):
+            headings.append(heading.get_text().strip())
+
+        page_text = soup.get_text().lower()
+        mentions = frozenset(term for term in self.watch_terms if term in page_text)
+
+        return PageSnapshot(status_code, headings, mentions, time.time())
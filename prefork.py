@@ -0,0 +1,147 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import app as chatbot_app
+from logging_config import get_logger
+
+logger = get_logger('prefork')
+
+# `workers` processes are forked from a master that has already loaded the
+# model; each one checks every model_check_interval seconds whether /train
+# (in any worker) replaced the model file
+PREFORK_SETTINGS = {
+    'workers': 4,
+    'host': '0.0.0.0',
+    'port': 8000,
+    'server': 'asgi',
+    'model_check_interval': 2.0
+}
+SERVERS = ('asgi', 'flask')
+
+
+class PreforkServer:
+    """Master process: loads the chatbot once, then forks workers that accept on one shared socket.
+
+    The workers inherit the master's memory copy-on-write, and the model
+    arrays are memory-mapped from the model file, so the page cache holds
+    them once for every worker. The master replaces workers that die, on the
+    latest model file.
+    """
+
+    def __init__(self, workers=4, host='0.0.0.0', port=8000, server='asgi', model_check_interval=2.0):
+        if server not in SERVERS:
+            raise ValueError(f"Unknown server {server!r}, expected one of {', '.join(SERVERS)}")
+        self.num_workers = workers
+        self.host = host
+        self.port = port
+        self.server = server
+        self.model_check_interval = model_check_interval
+        self.workers = set()
+        self.running = False
+        self.sock = None
+
+    def run(self):
+        self.sock = socket.create_server((self.host, self.port), backlog=2048)
+        self.port = self.sock.getsockname()[1]
+        if self.server == 'asgi':
+            # Imported here so its modules are shared with the workers too
+            import asgi
+
+        self._prepare_fork()
+        self.running = True
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.num_workers):
+            self._spawn()
+        logger.info("🚀 Master %d serving on %s:%d with %d %s workers",
+                    os.getpid(), self.host, self.port, self.num_workers, self.server)
+
+        while True:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self.workers.discard(pid)
+            if self.running:
+                logger.warning("⚠️  Worker %d exited with status %d, starting a new one", pid, status)
+                chatbot_app.reload_model_if_changed()
+                self._prepare_fork()
+                self._spawn()
+        self.sock.close()
+
+    def _prepare_fork(self):
+        chatbot_app.chatbot.page_cache.before_fork()
+        # Keep the collector from touching (and so copying) every inherited object
+        gc.collect()
+        gc.freeze()
+
+    def _handle_stop(self, signum, frame):
+        self.running = False
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self._serve()
+        except Exception as e:
+            logger.exception("❌ Worker %d failed: %s", os.getpid(), e)
+            os._exit(1)
+        os._exit(0)
+
+    def _serve(self):
+        """Worker process: restart background threads, follow model file swaps and serve"""
+        chatbot_app.chatbot.page_cache.after_fork()
+        chatbot_app.chatbot.page_cache.start()
+        threading.Thread(target=self._watch_model, name='model-watcher', daemon=True).start()
+
+        if self.server == 'asgi':
+            import asgi
+            import uvicorn
+            config = uvicorn.Config(asgi.application, lifespan='on', log_level='warning')
+            uvicorn.Server(config).run(sockets=[self.sock])
+        else:
+            from werkzeug.serving import make_server
+            make_server(self.host, self.port, chatbot_app.app, threaded=True,
+                        fd=self.sock.fileno()).serve_forever()
+
+    def _watch_model(self):
+        while True:
+            time.sleep(self.model_check_interval)
+            try:
+                chatbot_app.reload_model_if_changed()
+            except Exception as e:
+                logger.exception("❌ Could not reload the model file: %s", e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the chatbot from pre-forked worker processes")
+    parser.add_argument('--workers', type=int, default=PREFORK_SETTINGS['workers'])
+    parser.add_argument('--host', default=PREFORK_SETTINGS['host'])
+    parser.add_argument('--port', type=int, default=PREFORK_SETTINGS['port'])
+    parser.add_argument('--server', choices=SERVERS, default=PREFORK_SETTINGS['server'])
+    parser.add_argument('--model-check-interval', type=float, default=PREFORK_SETTINGS['model_check_interval'])
+    args = parser.parse_args()
+
+    print("🚀 Starting Smart Brainovision Chatbot (prefork)...")
+    print(f"🌐 Website: {chatbot_app.WEBSITE_URL}")
+    print(f"📍 Chat: http://localhost:{args.port}")
+    PreforkServer(args.workers, args.host, args.port, args.server, args.model_check_interval).run()
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,6 @@
+// Set to true to hold each answer back for 1-2 s, as if it were being typed
+const SIMULATE_TYPING_DELAY = false;
+
 function getCurrentTime() {
     const now = new Date();
     return now.toLocaleTimeString('en-US', { 
@@ -29,6 +32,7 @@ function addMessage(message, isUser = false) {
     
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageDiv.querySelector('.message-bubble');
 }
 
 function formatMessage(message) {
@@ -71,6 +75,13 @@ function showTypingIndicator() {
     chatMessages.scrollTop = chatMessages.scrollHeight;
 }
 
+function setTypingStatus(text) {
+    const status = document.querySelector('#typingIndicator span');
+    if (status) {
+        status.textContent = text;
+    }
+}
+
 function hideTypingIndicator() {
     const typingIndicator = document.getElementById('typingIndicator');
     if (typingIndicator) {
@@ -78,6 +89,33 @@ function hideTypingIndicator() {
     }
 }
 
+async function readServerSentEvents(response, onEvent) {
+    // Events are separated by a blank line; each has an event: and a data: line
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            onEvent(event, JSON.parse(data));
+        }
+    }
+}
+
 async function sendMessage() {
     const userInput = document.getElementById('userInput');
     const message = userInput.value.trim();
@@ -90,9 +128,10 @@ async function sendMessage() {
     
     // Show typing indicator
     showTypingIndicator();
+    performance.mark('chat-request');
     
     try {
-        const response = await fetch('/api/chat', {
+        const response = await fetch('/api/chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -100,19 +139,38 @@ async function sendMessage() {
             body: JSON.stringify({ message: message })
         });
         
-        const data = await response.json();
-        
-        // Hide typing indicator
-        hideTypingIndicator();
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         
-        if (data.status === 'success') {
-            // Simulate realistic typing delay
-            setTimeout(() => {
-                addMessage(data.response);
-            }, 1000 + Math.random() * 1000);
-        } else {
-            addMessage('I apologize, but I encountered an error. Please try again or visit https://www.brainovision.in directly.');
+        if (SIMULATE_TYPING_DELAY) {
+            await new Promise(resolve => setTimeout(resolve, 1000 + Math.random() * 1000));
         }
+        
+        // The reply bubble is created by the first chunk and grows with every later one
+        let bubble = null;
+        let text = '';
+        await readServerSentEvents(response, (event, data) => {
+            if (event === 'intent' && data.intent) {
+                setTypingStatus(`Looking up ${data.intent.replace(/_/g, ' ')}...`);
+            } else if (event === 'chunk') {
+                text += data.text;
+                if (!bubble) {
+                    // Shows up as "time-to-first-token" in the browser's performance timeline
+                    performance.measure('time-to-first-token', 'chat-request');
+                    hideTypingIndicator();
+                    bubble = addMessage(text);
+                } else {
+                    bubble.innerHTML = formatMessage(text);
+                    const chatMessages = document.getElementById('chatMessages');
+                    chatMessages.scrollTop = chatMessages.scrollHeight;
+                }
+            } else if (event === 'error') {
+                hideTypingIndicator();
+                addMessage('I apologize, but I encountered an error. Please try again or visit https://www.brainovision.in directly.');
+            }
+        });
+        hideTypingIndicator();
     } catch (error) {
         hideTypingIndicator();
         addMessage('I apologize, but I am unable to process your request at this time. Please visit https://www.brainovision.in for direct assistance.');
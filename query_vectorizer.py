@@ -0,0 +1,139 @@
+import re
+import unicodedata
+import numpy as np
+from scipy.sparse import csr_matrix
+
+WHITE_SPACES = re.compile(r"\s\s+")
+
+
+def _strip_accents_unicode(text):
+    normalized = unicodedata.normalize('NFKD', text)
+    if normalized == text:
+        return text
+    return ''.join(ch for ch in normalized if not unicodedata.combining(ch))
+
+
+def _strip_accents_ascii(text):
+    return unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+
+
+class TfidfQueryVectorizer:
+    """Transform-only stand-in for a fitted TfidfVectorizer.
+
+    Rebuilt from the vocabulary, idf weights and parameters stored in a
+    model file, it turns queries into the same vectors as the vectorizer it
+    was saved from, without importing scikit-learn. Only the built-in
+    analyzers ('word', 'char', 'char_wb') are supported.
+    """
+
+    def __init__(self, vocabulary, idf, params, stop_words=None):
+        if params['analyzer'] not in ('word', 'char', 'char_wb'):
+            raise ValueError(f"Unsupported analyzer {params['analyzer']!r}")
+        self.vocabulary_ = vocabulary
+        self.idf_ = idf
+        self.analyzer = params['analyzer']
+        self.lowercase = params['lowercase']
+        self.strip_accents = params['strip_accents']
+        self.ngram_range = tuple(params['ngram_range'])
+        self.binary = params['binary']
+        self.norm = params['norm']
+        self.use_idf = params['use_idf']
+        self.sublinear_tf = params['sublinear_tf']
+        self.dtype = np.dtype(params['dtype'])
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.token_pattern = re.compile(params['token_pattern'])
+
+        accents = {None: None, 'unicode': _strip_accents_unicode, 'ascii': _strip_accents_ascii}
+        self._strip = accents[self.strip_accents or None]
+
+    def analyze(self, text):
+        """Terms of one document, in the order the fitted vectorizer produces them"""
+        if self.lowercase:
+            text = text.lower()
+        if self._strip is not None:
+            text = self._strip(text)
+        if self.analyzer == 'word':
+            return self._word_ngrams(self.token_pattern.findall(text))
+        if self.analyzer == 'char_wb':
+            return self._char_wb_ngrams(text)
+        return self._char_ngrams(text)
+
+    def _word_ngrams(self, tokens):
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        ngrams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(tokens) + 1)):
+            for i in range(len(tokens) - n + 1):
+                ngrams.append(' '.join(tokens[i:i + n]))
+        return ngrams
+
+    def _char_ngrams(self, text):
+        text = WHITE_SPACES.sub(' ', text)
+        min_n, max_n = self.ngram_range
+        ngrams = list(text) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(text) + 1)):
+            for i in range(len(text) - n + 1):
+                ngrams.append(text[i:i + n])
+        return ngrams
+
+    def _char_wb_ngrams(self, text):
+        text = WHITE_SPACES.sub(' ', text)
+        min_n, max_n = self.ngram_range
+        ngrams = []
+        for word in text.split():
+            word = ' ' + word + ' '
+            for n in range(min_n, max_n + 1):
+                offset = 0
+                ngrams.append(word[offset:offset + n])
+                while offset + n < len(word):
+                    offset += 1
+                    ngrams.append(word[offset:offset + n])
+                # A word shorter than n is counted once
+                if offset == 0:
+                    break
+        return ngrams
+
+    def transform(self, raw_documents):
+        """Sparse (documents x vocabulary) TF-IDF matrix with L2-normalized rows"""
+        indices = []
+        values = []
+        indptr = [0]
+        for document in raw_documents:
+            counts = {}
+            for term in self.analyze(document):
+                column = self.vocabulary_.get(term)
+                if column is not None:
+                    counts[column] = counts.get(column, 0) + 1
+            # Columns are sorted, as in the fitted vectorizer's output
+            for column in sorted(counts):
+                indices.append(column)
+                values.append(counts[column])
+            indptr.append(len(indices))
+
+        data = np.asarray(values, dtype=self.dtype)
+        indices = np.asarray(indices, dtype=np.int32)
+        if self.binary:
+            data.fill(1)
+        if self.sublinear_tf:
+            np.log(data, data)
+            data += 1.0
+        if self.use_idf:
+            data *= self.idf_[indices]
+        if self.norm is not None:
+            data = self._normalize(data, indptr)
+
+        return csr_matrix((data, indices, np.asarray(indptr, dtype=np.int32)),
+                          shape=(len(indptr) - 1, len(self.vocabulary_)), dtype=self.dtype)
+
+    def _normalize(self, data, indptr):
+        for start, end in zip(indptr, indptr[1:]):
+            row = data[start:end]
+            # Accumulated term by term, in the same order as scikit-learn
+            total = 0.0
+            for value in row:
+                total += value * value if self.norm == 'l2' else abs(value)
+            length = np.sqrt(total) if self.norm == 'l2' else total
+            if length != 0:
+                row /= length
+        return data
@@ -0,0 +1,132 @@
+import itertools
+import json
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+
+# Every frame is a fixed little-endian header followed by UTF-8 bytes.
+# Requests: request id, op, payload length, payload. Responses: request id,
+# status (the answering stage, or STATUS_OK / STATUS_ERROR), value length,
+# body length, value (the matched intent or tag), body (the answer).
+# Ids let a connection carry many requests at once; the daemon answers
+# each connection's requests in the order they were sent.
+REQUEST_HEADER = struct.Struct('<IBI')
+RESPONSE_HEADER = struct.Struct('<IBHI')
+OP_ANSWER = 0
+OP_STATS = 1
+STAGES = ('website', 'model', 'fallback')
+STATUS_OK = 254
+STATUS_ERROR = 255
+MAX_PAYLOAD = 1024 * 1024
+
+
+class ScoringError(RuntimeError):
+    """The scoring daemon could not answer a request"""
+
+
+def encode_request(request_id, op, payload=''):
+    data = payload.encode('utf-8')
+    return REQUEST_HEADER.pack(request_id, op, len(data)) + data
+
+
+def encode_response(request_id, status, value='', body=''):
+    value = value.encode('utf-8')
+    body = body.encode('utf-8')
+    return RESPONSE_HEADER.pack(request_id, status, len(value), len(body)) + value + body
+
+
+def _read_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Scoring daemon closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class ScoringClient:
+    """Pipelined connection to scoring_daemon.py, shared by every thread of a web process.
+
+    Callers write their frames without waiting for earlier replies; one
+    reader thread hands each reply to the caller waiting on its id. The
+    connection is opened on first use, and again in a forked child.
+    """
+
+    def __init__(self, path, timeout=10):
+        self.path = path
+        self.timeout = timeout
+        self._sock = None
+        self._pid = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def answer(self, messages):
+        """[(stage, intent or tag or None, answer), ...] for every message"""
+        replies = self._request([(OP_ANSWER, message) for message in messages])
+        return [(STAGES[status], value or None, body) for status, value, body in replies]
+
+    def stats(self):
+        """The daemon's batching and response cache statistics"""
+        (_, _, body), = self._request([(OP_STATS, '')])
+        return json.loads(body)
+
+    def _request(self, requests):
+        futures = []
+        with self._lock:
+            sock = self._connection()
+            frames = []
+            for op, payload in requests:
+                request_id = next(self._ids) & 0xFFFFFFFF
+                future = Future()
+                self._pending[request_id] = future
+                futures.append(future)
+                frames.append(encode_request(request_id, op, payload))
+            try:
+                sock.sendall(b''.join(frames))
+            except OSError as e:
+                self._disconnect(sock, e)
+        replies = [future.result(self.timeout) for future in futures]
+        if any(status == STATUS_ERROR for status, _, _ in replies):
+            raise ScoringError("The scoring daemon failed to answer")
+        return replies
+
+    def _connection(self):
+        if self._sock is None or self._pid != os.getpid():
+            # A connection inherited over fork belongs to the parent
+            self._pending = {}
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            self._sock = sock
+            self._pid = os.getpid()
+            threading.Thread(target=self._read_loop, args=(sock,),
+                             name='scoring-client', daemon=True).start()
+        return self._sock
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                request_id, status, value_length, body_length = RESPONSE_HEADER.unpack(
+                    _read_exactly(sock, RESPONSE_HEADER.size))
+                data = _read_exactly(sock, value_length + body_length)
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result((status, data[:value_length].decode('utf-8'),
+                                       data[value_length:].decode('utf-8')))
+        except (OSError, struct.error) as e:
+            with self._lock:
+                self._disconnect(sock, e)
+
+    def _disconnect(self, sock, error):
+        """Fail every request still waiting on sock; the next call reconnects. Hold _lock."""
+        if self._sock is sock:
+            self._sock = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError(f"Lost the scoring daemon: {error}"))
+        sock.close()
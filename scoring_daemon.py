@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from deadline import Deadline
+from scoring_client import (MAX_PAYLOAD, OP_ANSWER, OP_STATS, REQUEST_HEADER, STAGES, STATUS_ERROR, STATUS_OK,
+                            encode_response)
+
+# This process is the one doing the scoring, so it must not load app.py in
+# client mode itself
+os.environ.pop('CHATBOT_SCORING_SOCKET', None)
+import app as chatbot_app
+from logging_config import get_logger
+
+logger = get_logger('scoring_daemon')
+
+# Queries waiting when the scoring thread frees up are matched together, up
+# to max_batch at a time (one TF-IDF pass for all of them)
+DAEMON_SETTINGS = {
+    'socket': '/tmp/brainovision-scoring.sock',
+    'max_batch': 64,
+    'model_check_interval': 2.0
+}
+
+
+class ScoringDaemon:
+    """Serves SmartChatbot answers to web processes over a Unix socket, micro-batching what arrives together"""
+
+    def __init__(self, path, max_batch=64, model_check_interval=2.0):
+        self.path = path
+        self.max_batch = max_batch
+        self.model_check_interval = model_check_interval
+        self.batches = 0
+        self.queries = 0
+        self._queue = None
+        # One scoring thread: the work is CPU-bound, so more would only contend for the GIL
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._queue = asyncio.Queue()
+        threading.Thread(target=self._watch_model, name='model-watcher', daemon=True).start()
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        batcher = asyncio.create_task(self._batch_loop())
+        logger.info("🧮 Scoring daemon listening on %s", self.path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            os.remove(self.path)
+
+    async def _handle(self, reader, writer):
+        """Queue every answer request of one connection; the replies keep their order"""
+        replies = asyncio.Queue()
+        sender = asyncio.create_task(self._send_replies(writer, replies))
+        try:
+            while True:
+                request_id, op, length = REQUEST_HEADER.unpack(await reader.readexactly(REQUEST_HEADER.size))
+                if length > MAX_PAYLOAD:
+                    logger.warning("⚠️  Dropping a client that sent a %d byte request", length)
+                    break
+                payload = (await reader.readexactly(length)).decode('utf-8', 'replace')
+                done = asyncio.get_running_loop().create_future()
+                if op == OP_ANSWER:
+                    self._queue.put_nowait((payload, done))
+                elif op == OP_STATS:
+                    done.set_result((STATUS_OK, '', json.dumps(self.stats())))
+                else:
+                    done.set_result((STATUS_ERROR, '', ''))
+                replies.put_nowait((request_id, done))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            replies.put_nowait(None)
+            await sender
+
+    async def _send_replies(self, writer, replies):
+        try:
+            while True:
+                item = await replies.get()
+                if item is None:
+                    break
+                request_id, done = item
+                writer.write(encode_response(request_id, *await done))
+                if replies.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            results = await loop.run_in_executor(self._executor, self._score, [text for text, _ in batch])
+            self.batches += 1
+            self.queries += len(batch)
+            for (_, done), result in zip(batch, results):
+                done.set_result(result)
+
+    def _score(self, texts):
+        """(status, value, answer) for every query, matched in one pass"""
+        # Take one reference so a model reload can't swap chatbots mid-batch
+        bot = chatbot_app.chatbot
+        try:
+            replies = bot.respond(texts, Deadline(chatbot_app.DEADLINE_SETTINGS['batch_budget']))
+        except Exception as e:
+            logger.exception("❌ Scoring failed: %s", e)
+            return [(STATUS_ERROR, '', '')] * len(texts)
+        return [(STAGES.index(meta['answered_by']), meta['intent'] or '', answer) for answer, meta in replies]
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'queries': self.queries,
+            'mean_batch_size': round(self.queries / self.batches, 2) if self.batches else 0.0,
+            'response_cache': chatbot_app.chatbot.response_cache.stats()
+        }
+
+    def _watch_model(self):
+        # Web processes write the model file on /train; follow it like prefork workers do
+        while True:
+            time.sleep(self.model_check_interval)
+            try:
+                chatbot_app.reload_model_if_changed()
+            except Exception as e:
+                logger.exception("❌ Could not reload the model file: %s", e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve chatbot answers to web processes over a Unix socket")
+    parser.add_argument('--socket', default=DAEMON_SETTINGS['socket'])
+    parser.add_argument('--max-batch', type=int, default=DAEMON_SETTINGS['max_batch'])
+    parser.add_argument('--model-check-interval', type=float, default=DAEMON_SETTINGS['model_check_interval'])
+    args = parser.parse_args()
+
+    print("🧮 Starting the Brainovision scoring daemon...")
+    print(f"🔌 Web processes connect with CHATBOT_SCORING_SOCKET={args.socket}")
+    ScoringDaemon(args.socket, args.max_batch, args.model_check_interval).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+INDEX_MODES = ('patterns', 'centroids', 'medoids')
+
+
+class PatternIndex:
+    """Inverted TF-IDF index for scoring queries against training patterns.
+
+    The pattern matrix is kept transposed (one row of pattern weights per
+    term), so a query only touches the rows of its own non-zero terms. Rows
+    of both matrices are expected to be L2-normalized, as TfidfVectorizer
+    produces them, which makes the dot product the cosine similarity.
+    term_patterns is that transposed matrix if the caller already has it,
+    e.g. memory-mapped from a model file; otherwise it is built here.
+    """
+
+    def __init__(self, tfidf_matrix, term_patterns=None):
+        self.n_patterns, self.n_terms = tfidf_matrix.shape
+        self.term_patterns = _term_major(tfidf_matrix, term_patterns)
+
+    def scores(self, query_vecs):
+        """Sparse (queries x patterns) similarities; patterns sharing no term are left out"""
+        return csr_matrix(query_vecs) @ self.term_patterns
+
+    def best(self, query_vecs):
+        """Index and score of the best pattern for every query.
+
+        Ties go to the lowest pattern index, and a query sharing no term
+        with any pattern gets (0, 0.0), the same answer as an argmax over
+        the dense similarities.
+        """
+        scores = self.scores(query_vecs)
+        best_idx = np.zeros(scores.shape[0], dtype=np.int64)
+        best_scores = np.zeros(scores.shape[0])
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            if start == end:
+                continue
+            data = scores.data[start:end]
+            top = data.max()
+            best_idx[row] = scores.indices[start:end][data == top].min()
+            best_scores[row] = top
+        return best_idx, best_scores
+
+    def top_k(self, query_vecs, k=5):
+        """[(pattern index, score), ...] of the k best patterns for every query, best first"""
+        scores = self.scores(query_vecs)
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            data = scores.data[start:end]
+            indices = scores.indices[start:end]
+            if len(data) > k:
+                # Keep everything tied with the k-th score so ties still go to the lowest index
+                kth = -np.partition(-data, k - 1)[k - 1]
+                keep = data >= kth
+                data, indices = data[keep], indices[keep]
+            order = np.lexsort((indices, -data))[:k]
+            results.append([(int(indices[i]), float(data[i])) for i in order])
+        return results
+
+
+class TagIndex:
+    """Two-stage index: shortlist tags by representative vectors, then rerank their patterns.
+
+    Each tag is represented by its normalized centroid, or by a few medoid
+    patterns. A query is scored against the representatives first, and only
+    the patterns of the candidate_tags best tags are scored exactly, so the
+    returned score is still a real pattern similarity. best() has the same
+    interface as PatternIndex.best().
+
+    Patterns are scored from one term-major matrix whose columns are grouped
+    by tag. build_model writes each tag's patterns next to each other, so a
+    term_patterns matrix passed in (see PatternIndex) is used as it is;
+    otherwise the patterns are reordered by tag into a private copy.
+    """
+
+    def __init__(self, tfidf_matrix, tags, candidate_tags=3, medoids_per_tag=0, term_patterns=None):
+        tfidf_matrix = csr_matrix(tfidf_matrix)
+        self.candidate_tags = candidate_tags
+        self.tag_names = list(dict.fromkeys(tags))
+        tag_codes = {tag: code for code, tag in enumerate(self.tag_names)}
+        row_tags = np.array([tag_codes[tag] for tag in tags], dtype=np.int64)
+
+        order = np.argsort(row_tags, kind='stable')
+        if np.array_equal(order, np.arange(len(order))):
+            self.term_patterns = _term_major(tfidf_matrix, term_patterns)
+        else:
+            self.term_patterns = _term_major(tfidf_matrix[order])
+        # Tag code -> [start, end) of its patterns' columns in term_patterns
+        self.tag_bounds = np.searchsorted(row_tags[order], np.arange(len(self.tag_names) + 1))
+
+        representatives = []
+        representative_tags = []
+        self.tag_rows = []
+        for code in range(len(self.tag_names)):
+            rows = order[self.tag_bounds[code]:self.tag_bounds[code + 1]]
+            patterns = tfidf_matrix[rows]
+            self.tag_rows.append(rows)
+
+            if medoids_per_tag:
+                chosen = rows[_medoids(patterns, medoids_per_tag)]
+                representatives.append(tfidf_matrix[chosen].toarray())
+                representative_tags.extend([code] * len(chosen))
+            else:
+                centroid = np.asarray(patterns.mean(axis=0))
+                representatives.append(centroid / (np.linalg.norm(centroid) or 1.0))
+                representative_tags.append(code)
+
+        # Only a handful of rows per tag, so the representatives are kept dense
+        self.representatives = np.vstack(representatives)
+        self.representative_tags = np.array(representative_tags, dtype=np.int64)
+
+    def candidates(self, terms, weights):
+        """Codes of the best candidate_tags tags for one query's term weights, best first"""
+        scores = self.representatives[:, terms] @ weights
+        tag_scores = np.zeros(len(self.tag_names))
+        np.maximum.at(tag_scores, self.representative_tags, scores)
+        shortlisted = np.flatnonzero(tag_scores > 0)
+        order = np.lexsort((shortlisted, -tag_scores[shortlisted]))
+        return shortlisted[order][:self.candidate_tags]
+
+    def best(self, query_vecs):
+        """Index and score of the best pattern among each query's candidate tags"""
+        query_vecs = csr_matrix(query_vecs)
+        best_idx = np.zeros(query_vecs.shape[0], dtype=np.int64)
+        best_scores = np.zeros(query_vecs.shape[0])
+        for row in range(query_vecs.shape[0]):
+            start, end = query_vecs.indptr[row], query_vecs.indptr[row + 1]
+            terms, weights = query_vecs.indices[start:end], query_vecs.data[start:end]
+            for code in self.candidates(terms, weights):
+                scores = _score_columns(self.term_patterns, terms, weights,
+                                        self.tag_bounds[code], self.tag_bounds[code + 1])
+                local = int(np.argmax(scores))
+                idx, score = self.tag_rows[code][local], scores[local]
+                if score > best_scores[row] or (score == best_scores[row] > 0 and idx < best_idx[row]):
+                    best_idx[row], best_scores[row] = idx, score
+        return best_idx, best_scores
+
+
+def _term_major(tfidf_matrix, term_patterns=None):
+    """The (terms x patterns) CSR matrix with sorted indices, reusing term_patterns if given"""
+    if term_patterns is None:
+        term_patterns = csr_matrix(tfidf_matrix.T)
+        term_patterns.sort_indices()
+    return term_patterns
+
+def _score_columns(postings, terms, weights, start, end):
+    """Dot products of one query with patterns start..end-1, read from sorted term-major postings"""
+    row_starts = postings.indptr[terms]
+    row_ends = postings.indptr[terms + 1]
+    # Each term's row is sorted by pattern, so the tag's entries are one slice of it
+    spans = [row_start + np.searchsorted(postings.indices[row_start:row_end], [start, end])
+             for row_start, row_end in zip(row_starts, row_ends)]
+    positions = np.concatenate([np.arange(first, last) for first, last in spans] or [[]]).astype(np.int64)
+    products = np.repeat(weights, [last - first for first, last in spans]) * postings.data[positions]
+    return np.bincount(postings.indices[positions] - start, weights=products, minlength=end - start)
+
+def _medoids(patterns, count):
+    """Greedily pick up to count rows that together cover the others best"""
+    similarities = (patterns @ patterns.T).toarray()
+    covered = np.zeros(similarities.shape[0])
+    chosen = []
+    for _ in range(min(count, similarities.shape[0])):
+        gains = np.maximum(similarities, covered).sum(axis=1)
+        gains[chosen] = -1
+        best = int(np.argmax(gains))
+        chosen.append(best)
+        covered = np.maximum(covered, similarities[best])
+    return chosen
+
+
+def build_index(tfidf_matrix, tags, mode='patterns', candidate_tags=3, medoids_per_tag=3, term_patterns=None):
+    """PatternIndex for mode 'patterns', otherwise a TagIndex over centroids or medoids"""
+    if mode not in INDEX_MODES:
+        raise ValueError(f"Unknown index mode {mode!r}, expected one of {', '.join(INDEX_MODES)}")
+    if mode == 'patterns':
+        return PatternIndex(tfidf_matrix, term_patterns)
+    return TagIndex(tfidf_matrix, tags, candidate_tags=candidate_tags,
+                    medoids_per_tag=medoids_per_tag if mode == 'medoids' else 0,
+                    term_patterns=term_patterns)
@@ -0,0 +1,175 @@
+import math
+import re
+from difflib import SequenceMatcher
+import Levenshtein
+
+
+class FuzzyIndex:
+    """SymSpell-style deletion index answering "which terms are similar to word".
+
+    Similarity is SequenceMatcher.ratio() above a threshold. A ratio above the
+    threshold needs a common subsequence longer than threshold/2 of the
+    combined length, which bounds how many characters either word can lose on
+    the way to it, so indexing deletes up to that depth finds every match.
+
+    The number of deletes grows combinatorially with word length, so long
+    words are compared by a length-filtered scan instead: long terms are
+    kept out of the index and always scanned, and a long query scans every
+    term once that is cheaper than expanding its deletes.
+    """
+
+    # Most deletes indexed for one term, and query deletes allowed per term
+    # before a plain scan is cheaper
+    MAX_TERM_DELETES = 5000
+    SCAN_FACTOR = 25
+
+    def __init__(self, terms, threshold, min_deletes=0):
+        self.terms = list(terms)
+        self.threshold = threshold
+        self.min_deletes = min_deletes
+
+        half = threshold / 2
+        self._delete_factor = (1 - half) - half * half / (1 - half)
+
+        self.delete_index = {}
+        self.scanned_terms = []
+        for idx, term in enumerate(self.terms):
+            if self._delete_count(len(term)) > self.MAX_TERM_DELETES:
+                self.scanned_terms.append(idx)
+                continue
+            for deleted in self._deletes(term):
+                self.delete_index.setdefault(deleted, []).append(idx)
+
+    def _max_deletes(self, length):
+        """Deletions needed so every pair above the threshold meets"""
+        depth = math.ceil(self._delete_factor * length) - 1
+        return max(depth, self.min_deletes)
+
+    def _delete_count(self, length):
+        """Upper bound on len(self._deletes(word)) for a word of this length"""
+        depth = min(self._max_deletes(length), length)
+        return sum(math.comb(length, k) for k in range(depth + 1))
+
+    def _within_length(self, word, term):
+        """False only if the lengths alone rule out a match, by ratio or by max distance"""
+        shorter, total = min(len(word), len(term)), len(word) + len(term)
+        return (total and 2 * shorter / total > self.threshold) or abs(len(word) - len(term)) <= self.min_deletes
+
+    def _deletes(self, word):
+        """All strings reachable from word by removing up to _max_deletes characters"""
+        results = {word}
+        level = {word}
+        for _ in range(min(self._max_deletes(len(word)), len(word))):
+            level = {w[:i] + w[i + 1:] for w in level for i in range(len(w))}
+            results |= level
+        return results
+
+    def candidates(self, word):
+        """Indices of terms sharing a deletion with word, in term order.
+
+        Long words and long terms may add terms that share no deletion; they
+        never pass the similarity checks callers apply.
+        """
+        if self._delete_count(len(word)) > self.SCAN_FACTOR * len(self.terms):
+            return [idx for idx, term in enumerate(self.terms) if self._within_length(word, term)]
+
+        found = {idx for idx in self.scanned_terms if self._within_length(word, self.terms[idx])}
+        for deleted in self._deletes(word):
+            found.update(self.delete_index.get(deleted, ()))
+        return sorted(found)
+
+    def matches(self, word):
+        """(index, similarity) of every term above the threshold, in term order"""
+        results = []
+        for idx in self.candidates(word):
+            similarity = SequenceMatcher(None, word, self.terms[idx]).ratio()
+            if similarity > self.threshold:
+                results.append((idx, similarity))
+        return results
+
+
+class SpellingCorrector:
+    """Spelling-correction index built once from a misspellings table.
+
+    Known variants are resolved with a single dict lookup. Everything else
+    goes through a FuzzyIndex, so only the handful of vocabulary entries
+    within a few deletions of the input word are scored with SequenceMatcher /
+    Levenshtein, no matter how large the table grows.
+    """
+
+    def __init__(self, misspellings, similarity_threshold=0.7,
+                 confident_threshold=0.8, max_distance=2, cache_size=10000):
+        self.confident_threshold = confident_threshold
+        self.max_distance = max_distance
+        self.cache_size = cache_size
+
+        # Ordered candidate list: (correct_word, variation), in the same order
+        # the original nested loops visited them, so ties resolve identically.
+        self.entries = []
+        self.canonical_order = {}
+        self.exact_hits = {}
+        for correct_word, variations in misspellings.items():
+            self.canonical_order[correct_word] = len(self.canonical_order)
+            for variation in list(variations) + [correct_word]:
+                self.entries.append((correct_word, variation))
+                self.exact_hits.setdefault(variation, correct_word)
+
+        # Levenshtein matches within max_distance also share a deletion
+        self.index = FuzzyIndex([variation for _, variation in self.entries],
+                                similarity_threshold, min_deletes=max_distance)
+        self._cache = {}
+
+    def correct_word(self, clean_word):
+        """Return the corrected form of a single cleaned word"""
+        cached = self._cache.get(clean_word)
+        if cached is not None:
+            return cached
+
+        # A known variant is a perfect match, so no fuzzy scoring is needed
+        best_match = self.exact_hits.get(clean_word)
+        if best_match is None:
+            best_match = self._fuzzy_match(clean_word)
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[clean_word] = best_match
+        return best_match
+
+    def _fuzzy_match(self, clean_word):
+        best_match = clean_word
+        highest_similarity = 0
+        candidates = self.index.candidates(clean_word)
+
+        for idx in candidates:
+            correct_word, variation = self.entries[idx]
+            similarity = SequenceMatcher(None, clean_word, variation).ratio()
+            if similarity > highest_similarity and similarity > self.index.threshold:
+                highest_similarity = similarity
+                best_match = correct_word
+
+        # Use Levenshtein distance as fallback
+        if highest_similarity < self.confident_threshold and len(clean_word) >= 4:
+            keys = {self.entries[idx][0] for idx in candidates
+                    if self.entries[idx][0] == self.entries[idx][1]}
+            for correct_word in sorted(keys, key=self.canonical_order.get):
+                if Levenshtein.distance(clean_word, correct_word) <= self.max_distance:
+                    best_match = correct_word
+                    break
+
+        return best_match
+
+    def correct(self, text):
+        """Correct common spelling mistakes in the text"""
+        corrected_words = []
+
+        for word in text.lower().split():
+            # Remove special characters
+            clean_word = re.sub(r'[^\w\s]', '', word)
+
+            if len(clean_word) < 3:  # Skip very short words
+                corrected_words.append(word)
+                continue
+
+            corrected_words.append(self.correct_word(clean_word))
+
+        return ' '.join(corrected_words)
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, 'benchmarks'))
+
+# Importing app starts the page cache; keep its fetches off the real site
+os.environ.setdefault('CHATBOT_WEBSITE_URL', 'http://127.0.0.1:9')
+os.environ.pop('CHATBOT_SCORING_SOCKET', None)
+
+
+@pytest.fixture(scope='session')
+def model_data(tmp_path_factory):
+    """The shipped training data, trained and loaded back the way /train and startup do"""
+    from model_store import load_model_file
+    from training import build_model, save_model
+    with open(os.path.join(ROOT, 'website_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    filename = str(tmp_path_factory.mktemp('model') / 'model.bvcm')
+    save_model(build_model(training_data), filename)
+    return load_model_file(filename)
+
+
+@pytest.fixture
+def chatbot(model_data):
+    """SmartChatbot with a fresh response cache and a page cache that is never started"""
+    import app
+    from page_cache import PageContentCache
+    return app.SmartChatbot(PageContentCache(app.WEBSITE_URL, []), model_data=model_data)
+
+
+@pytest.fixture
+def site():
+    """The offline stub of the website (benchmarks/stub_site.py)"""
+    from stub_site import StubSite
+    with StubSite() as site:
+        yield site
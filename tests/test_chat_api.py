@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def client(chatbot, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'chatbot', chatbot)
+    return app.app.test_client()
+
+
+@pytest.fixture
+def app_logs(monkeypatch):
+    """Records reaching the app logger, bypassing the queued handlers"""
+    import app
+    records = []
+
+    class Recorder(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    handler = Recorder()
+    app.logger.addHandler(handler)
+    yield records
+    app.logger.removeHandler(handler)
+
+
+def test_chat_answers_with_meta(client):
+    reply = client.post('/api/chat', json={'message': 'hello there'}).get_json()
+    assert reply['status'] == 'success'
+    assert reply['meta']['answered_by'] in ('website', 'model', 'fallback')
+
+
+@pytest.mark.parametrize('body', ['{not json', '[1, 2]', '{"message": 5}'])
+def test_malformed_chat_body_is_a_400_without_a_traceback(client, app_logs, body):
+    response = client.post('/api/chat', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+    assert [(r.levelno, r.exc_info) for r in app_logs] == [(logging.WARNING, None)]
+
+
+@pytest.mark.parametrize('body, content_type', [
+    ('[1, 2]', 'application/json'),
+    ('{not json', 'application/json'),
+    ('{"messages": "hi"}', 'application/json'),
+    ('messages=hi', 'application/x-www-form-urlencoded'),
+])
+def test_malformed_batch_body_is_a_json_400(client, app_logs, body, content_type):
+    response = client.post('/api/chat/batch', data=body, content_type=content_type)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+    assert [(r.levelno, r.exc_info) for r in app_logs] == [(logging.WARNING, None)]
+
+
+def test_malformed_stream_body_ends_with_an_error_event(client, app_logs):
+    response = client.post('/api/chat/stream', data='{not json', content_type='application/json')
+    assert response.get_data(as_text=True).startswith('event: error\n')
+    assert [(r.levelno, r.exc_info) for r in app_logs] == [(logging.WARNING, None)]
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from metrics import UPSTREAM_SKIPPED
+from page_cache import PageContentCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', clock)
+    return clock
+
+
+def skipped(reason):
+    """Current value of chatbot_upstream_fetches_skipped_total for reason"""
+    return dict((labels, value) for _, labels, value in UPSTREAM_SKIPPED.samples()).get(
+        f'{{reason="{reason}"}}', 0)
+
+
+def test_closed_open_half_open_closed(clock):
+    changes = []
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, on_change=changes.append)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one trial call while it is in flight
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+    assert changes == [OPEN, HALF_OPEN, CLOSED]
+
+
+def test_failed_trial_opens_the_circuit_again(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+class BlockingSession:
+    """Holds every fetch until release is set"""
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.fetches = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, url, timeout):
+        self.fetches += 1
+        self.started.set()
+        self.release.wait(5)
+        return type('Response', (), {'status_code': self.status_code, 'content': b'<h1>Courses</h1>'})()
+
+
+def test_concurrent_refreshes_coalesce_into_one_fetch():
+    cache = PageContentCache('http://site.test', ['/courses'])
+    cache._session = BlockingSession()
+    url = cache.urls[0]
+    before = skipped('coalesced')
+
+    cache.schedule_refresh(url)
+    assert cache._session.started.wait(5)
+    threads = [threading.Thread(target=cache.schedule_refresh, args=(url,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache._session.release.set()
+    cache._executor.shutdown(wait=True)
+
+    assert cache._session.fetches == 1
+    assert skipped('coalesced') - before == 8
+    assert cache.get(url).headings == ['Courses']
+
+
+def test_open_circuit_skips_refreshes():
+    cache = PageContentCache('http://site.test', ['/courses'], failure_threshold=2, reset_timeout=60)
+    session = cache._session = BlockingSession(status_code=503)
+    session.release.set()
+    url = cache.urls[0]
+    before = skipped('circuit_open')
+
+    for _ in range(2):
+        cache.refresh(url)
+    assert cache.breaker.state == OPEN
+    for _ in range(5):
+        cache.schedule_refresh(url)
+    cache._executor.shutdown(wait=True)
+
+    assert session.fetches == 2
+    assert skipped('circuit_open') - before == 5
+    # 5xx pages are not stored
+    assert cache.get(url) is None
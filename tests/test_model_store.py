@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from model_store import MAGIC, FORMAT_VERSION, PREAMBLE, ModelFormatError, load_model_file
+from similarity import build_index
+from training import build_model, save_model
+
+TRAINING_DATA = {'intents': [
+    {'tag': 'greeting', 'patterns': ['hello', 'hi there'], 'responses': ['Hello!']},
+    {'tag': 'courses', 'patterns': ['which courses', 'python course'], 'responses': ['Our courses']},
+]}
+
+
+@pytest.fixture
+def model_file(tmp_path):
+    filename = str(tmp_path / 'model.bvcm')
+    save_model(build_model(TRAINING_DATA), filename)
+    return filename
+
+
+def rewrite_header(filename, edit):
+    """Apply edit to the JSON header of a model file, keeping the arrays where they are"""
+    with open(filename, 'rb') as f:
+        data = f.read()
+    _, _, length = PREAMBLE.unpack_from(data)
+    header = json.loads(data[PREAMBLE.size:PREAMBLE.size + length])
+    edit(header)
+    encoded = json.dumps(header).encode('utf-8').ljust(length)
+    assert len(encoded) == length
+    with open(filename, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, length) + encoded + data[PREAMBLE.size + length:])
+
+
+def test_round_trip(model_file):
+    model = load_model_file(model_file)
+    assert list(model['tags']) == ['greeting', 'greeting', 'courses', 'courses']
+    assert model['tfidf_matrix'].shape[0] == 4
+
+
+def test_pattern_index_uses_the_mapped_transposed_matrix(model_file):
+    model = load_model_file(model_file)
+    index = build_index(model['tfidf_matrix'], model['tags'], term_patterns=model['term_patterns'])
+    assert (index.term_patterns != model['tfidf_matrix'].T).nnz == 0
+    for array in (index.term_patterns.data, index.term_patterns.indices, index.term_patterns.indptr):
+        assert not array.flags.owndata and not array.flags.writeable
+
+
+@pytest.mark.parametrize('edit', [
+    lambda header: header.pop('arrays'),
+    lambda header: header.pop('shape'),
+    lambda header: header['vectorizer'].pop('ngram_range'),
+    lambda header: header['arrays']['idf'].pop('offset'),
+    lambda header: header.update(shape='4x9'),
+    lambda header: header.update(arrays=[]),
+    lambda header: header.pop('stop_words'),
+    lambda header: header.update(stop_words='english'),
+])
+def test_malformed_header_raises_model_format_error(model_file, edit):
+    rewrite_header(model_file, edit)
+    with pytest.raises(ModelFormatError):
+        load_model_file(model_file)
@@ -0,0 +1,141 @@
+import pytest
+
+import page_cache
+from page_cache import PageContentCache
+
+URL = 'http://site.test/courses'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+
+class FakeSession:
+    """Serves one page whose heading the test can change between fetches"""
+    def __init__(self):
+        self.heading = 'Python Full Stack'
+        self.fetches = 0
+
+    def get(self, url, timeout):
+        self.fetches += 1
+        return FakeResponse(200, f'<h1>{self.heading}</h1>'.encode())
+
+
+class QueuedExecutor:
+    """Holds submitted refreshes until the test runs them"""
+    def __init__(self):
+        self.queued = []
+
+    def submit(self, func, *args):
+        self.queued.append((func, args))
+
+    def run_all(self):
+        queued, self.queued = self.queued, []
+        for func, args in queued:
+            func(*args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(page_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    cache = PageContentCache('http://site.test', ['/courses'], ttl=60, max_stale=600)
+    cache._session = FakeSession()
+    cache._executor = QueuedExecutor()
+    return cache
+
+
+def test_missing_page_schedules_one_fetch(cache):
+    assert cache.get(URL) is None
+    assert cache.get(URL) is None
+    assert len(cache._executor.queued) == 1
+
+    cache._executor.run_all()
+    assert cache.get(URL).headings == ['Python Full Stack']
+    assert cache._session.fetches == 1
+
+
+def test_fresh_page_is_served_without_a_refresh(cache, clock):
+    cache.get(URL)
+    cache._executor.run_all()
+    clock.now += 59
+    assert cache.get(URL).headings == ['Python Full Stack']
+    assert cache._executor.queued == []
+
+
+def test_stale_page_is_served_while_one_refresh_runs(cache, clock):
+    cache.get(URL)
+    cache._executor.run_all()
+    cache._session.heading = 'Java Full Stack'
+    clock.now += 61
+
+    # Every stale read returns the old content; only the first schedules a fetch
+    for _ in range(3):
+        assert cache.get(URL).headings == ['Python Full Stack']
+    assert len(cache._executor.queued) == 1
+
+    cache._executor.run_all()
+    assert cache.get(URL).headings == ['Java Full Stack']
+    assert cache._session.fetches == 2
+
+
+def test_expired_page_is_not_served(cache, clock):
+    cache.get(URL)
+    cache._executor.run_all()
+    clock.now += 601
+    assert cache.get(URL) is None
+    assert len(cache._executor.queued) == 1
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.fetches = 0
+
+    async def get(self, url, timeout):
+        self.fetches += 1
+        return FakeResponse(200, b'<h1>Async</h1>')
+
+
+def test_attached_loop_fetches_with_the_async_client(cache):
+    import asyncio
+    import threading
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = FakeAsyncClient()
+    cache.attach(loop, client)
+    try:
+        assert cache.get(URL) is None
+        for _ in range(100):
+            if cache._pages:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        cache.detach()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    assert cache.get(URL).headings == ['Async']
+    assert client.fetches == 1
+    assert cache._session.fetches == 0
+    assert cache._executor.queued == []
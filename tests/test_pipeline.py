@@ -0,0 +1,37 @@
+import pytest
+
+
+@pytest.fixture
+def stage_calls(chatbot, monkeypatch):
+    """Count the calls into each matching stage of chatbot"""
+    calls = {'spelling': 0, 'keywords': 0, 'tfidf': 0}
+
+    def counted(stage, func):
+        def wrapper(*args, **kwargs):
+            calls[stage] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(chatbot.spelling_corrector, 'correct',
+                        counted('spelling', chatbot.spelling_corrector.correct))
+    monkeypatch.setattr(chatbot.keyword_scorer, 'detect', counted('keywords', chatbot.keyword_scorer.detect))
+    monkeypatch.setattr(chatbot, '_match_model_tags', counted('tfidf', chatbot._match_model_tags))
+    return calls
+
+
+@pytest.mark.parametrize('message', ['qwxz blorp', 'tell me about the internship', 'hello there'])
+def test_each_stage_runs_once_per_message(chatbot, stage_calls, message):
+    chatbot.get_response(message)
+    expected_tfidf = 0 if 'internship' in message else 1
+    assert stage_calls == {'spelling': 1, 'keywords': 1, 'tfidf': expected_tfidf}
+
+
+def test_cached_messages_skip_keywords_and_tfidf(chatbot, stage_calls):
+    chatbot.get_response('qwxz blorp')
+    chatbot.get_response('qwxz blorp')
+    assert stage_calls == {'spelling': 2, 'keywords': 1, 'tfidf': 1}
+
+
+def test_a_batch_shares_one_tfidf_pass(chatbot, stage_calls):
+    chatbot.get_responses(['qwxz blorp', 'hello there', 'what courses do you offer'])
+    assert stage_calls == {'spelling': 3, 'keywords': 3, 'tfidf': 1}
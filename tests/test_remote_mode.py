@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+CLIENT = '''
+import threading
+import app
+print(app.chatbot.__class__.__name__)
+print(sorted(t.name for t in threading.enumerate()))
+print(app.app.test_client().get('/metrics').get_data(as_text=True))
+'''
+
+
+def test_client_mode_reports_no_page_cache_of_its_own(tmp_path):
+    env = dict(os.environ, CHATBOT_SCORING_SOCKET=str(tmp_path / 'missing.sock'))
+    output = subprocess.run([sys.executable, '-c', CLIENT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.startswith('RemoteChatbot\n')
+    assert 'page-cache-refresher' not in output
+    assert 'chatbot_upstream_circuit_state' not in output
+    assert 'chatbot_page_cache_lookups_total{' not in output
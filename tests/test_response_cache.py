@@ -0,0 +1,19 @@
+def test_cache_key_keeps_word_order(chatbot):
+    assert chatbot.analyze_query('Who  are you').cache_key == 'who are you'
+    assert chatbot.analyze_query('you are who').cache_key != chatbot.analyze_query('who are you').cache_key
+
+
+def test_answers_do_not_depend_on_what_was_cached_first(chatbot):
+    messages = ['you are who', 'who are you', 'training on-job', 'on-job training']
+    uncached = [meta['answered_by'] for _, meta in chatbot.respond(messages)]
+    chatbot.response_cache.clear()
+    for message in reversed(messages):
+        chatbot.respond([message])
+    cached = [meta['answered_by'] for _, meta in chatbot.respond(messages)]
+    assert cached == uncached
+
+
+def test_rephrasings_with_the_same_corrected_tokens_share_an_entry(chatbot):
+    chatbot.respond(['intership details'])
+    (_, meta), = chatbot.respond(['Internship  details'])
+    assert meta['cached']
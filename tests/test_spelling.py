@@ -0,0 +1,29 @@
+import time
+
+from spelling import FuzzyIndex, SpellingCorrector
+
+MISSPELLINGS = {
+    'internship': ['internship', 'intership', 'internsip', 'intrenship'],
+    'program': ['program', 'programme', 'progrm', 'progam'],
+    'course': ['course', 'corse', 'cource', 'coarse'],
+}
+
+
+def test_corrects_known_and_fuzzy_variants():
+    corrector = SpellingCorrector(MISSPELLINGS)
+    assert corrector.correct('intership corse') == 'internship course'
+    assert corrector.correct('internshp') == 'internship'
+
+
+def test_long_uncached_words_correct_in_milliseconds():
+    for word in ('professionalinternship', 'internshipprogramdetails', 'x' * 40):
+        corrector = SpellingCorrector(MISSPELLINGS)
+        start = time.perf_counter()
+        corrector.correct(word)
+        assert time.perf_counter() - start < 0.05, word
+
+
+def test_long_words_are_scanned_instead_of_expanded():
+    index = FuzzyIndex(['internship', 'internshipprogramdetails'], 0.7, min_deletes=2)
+    assert index.scanned_terms == [1]
+    assert [idx for idx, _ in index.matches('internshipprogramdetail')] == [1]
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from training import TrainingJob, TrainingRunner, training_lock
+from website_scraper import write_json_atomically
+
+TRY_LOCK = '''
+import fcntl, sys
+with open(sys.argv[1], 'a') as f:
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        sys.exit(1)
+'''
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="fcntl locks are POSIX only")
+def test_training_lock_excludes_other_processes(tmp_path):
+    lock_file = str(tmp_path / 'training.lock')
+    with training_lock(lock_file):
+        assert subprocess.run([sys.executable, '-c', TRY_LOCK, lock_file]).returncode == 1
+    assert subprocess.run([sys.executable, '-c', TRY_LOCK, lock_file]).returncode == 0
+
+
+def test_concurrent_json_writes_leave_one_complete_file(tmp_path):
+    filename = str(tmp_path / 'scrape_manifest.json')
+    payloads = [{'writer': i, 'pages': list(range(2000))} for i in range(8)]
+    threads = [threading.Thread(target=write_json_atomically, args=(filename, p)) for p in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(filename, encoding='utf-8') as f:
+        assert json.load(f) in payloads
+    assert os.listdir(tmp_path) == ['scrape_manifest.json']
+
+
+def test_a_failed_fit_is_retried_by_the_next_training_run(chatbot, site, tmp_path, monkeypatch):
+    import app
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app, 'WEBSITE_URL', site.url)
+    monkeypatch.setattr(app, 'chatbot', chatbot)
+    build_model = app.build_model
+
+    def fail_once(*args):
+        monkeypatch.setattr(app, 'build_model', build_model)
+        raise MemoryError("fit failed")
+
+    monkeypatch.setattr(app, 'build_model', fail_once)
+    with pytest.raises(MemoryError):
+        app._run_training(TrainingJob())
+
+    assert 'unchanged' not in app._run_training(TrainingJob())
+    assert app._run_training(TrainingJob())['unchanged']
+
+
+def test_train_with_other_options_than_the_running_job_is_a_conflict(monkeypatch):
+    import app
+    release = threading.Event()
+    runner = TrainingRunner(lambda job, **options: release.wait(5))
+    monkeypatch.setattr(app, 'training_runner', runner)
+    client = app.app.test_client()
+    try:
+        started = client.post('/train')
+        assert started.status_code == 202
+        assert client.post('/train').get_json()['job_id'] == started.get_json()['job_id']
+
+        for query in ('mode=char', 'crawl=1'):
+            conflict = client.post(f'/train?{query}')
+            assert conflict.status_code == 409
+            assert conflict.get_json()['job_id'] == started.get_json()['job_id']
+    finally:
+        release.set()
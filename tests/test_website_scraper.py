@@ -0,0 +1,59 @@
+import stub_site
+from website_scraper import WebsiteScraper
+
+
+def scraper(site, tmp_path, **kwargs):
+    return WebsiteScraper(site.url, manifest_file=str(tmp_path / 'manifest.json'), retries=0,
+                          crawl_delay=0, **kwargs)
+
+
+def scrape(site, tmp_path, **kwargs):
+    """A scraper that has scraped the site and saved its manifest, as a finished /train does"""
+    done = scraper(site, tmp_path, **kwargs)
+    done.scrape_website()
+    done.save_manifest()
+    return done
+
+
+def test_unchanged_site_is_not_changed_on_the_next_run(site, tmp_path):
+    scrape(site, tmp_path)
+    assert not scrape(site, tmp_path).site_changed
+
+
+def test_a_page_that_keeps_failing_is_not_a_change(site, tmp_path, monkeypatch):
+    monkeypatch.delitem(stub_site.PAGES, '/about')
+    first = scrape(site, tmp_path)
+    assert first.site_changed
+    assert first.manifest[f'{site.url}/about']['error'] == 404
+
+    assert not scrape(site, tmp_path).site_changed
+
+
+def test_a_new_failure_status_is_a_change(site, tmp_path, monkeypatch):
+    monkeypatch.delitem(stub_site.PAGES, '/about')
+    scrape(site, tmp_path)
+    site.server.failure_rate = 1.0
+    again = scraper(site, tmp_path)
+    again.scrape_website()
+    assert f'{site.url}/about' in again.changed_urls
+
+
+def test_a_crawl_follows_links_of_pages_scraped_without_them(site, tmp_path, monkeypatch):
+    site.server.etags = True
+    courses = stub_site.PAGES['/courses'].replace(b'</body>', b'<a href="/blog">Blog</a></body>')
+    monkeypatch.setitem(stub_site.PAGES, '/courses', courses)
+    monkeypatch.setitem(stub_site.PAGES, '/blog', stub_site._page('Blog', ['News'], ['Latest updates.']))
+
+    scrape(site, tmp_path)
+    crawler = scrape(site, tmp_path, crawl=True)
+    assert f'{site.url}/blog' in crawler.manifest
+
+    # Now that the links are stored, the next crawl gets them from the 304
+    assert scraper(site, tmp_path).manifest[f'{site.url}/courses']['links']
+    crawled = [url for url, _ in scraper(site, tmp_path, crawl=True).crawl()]
+    assert f'{site.url}/blog' in crawled
+
+
+def test_the_manifest_is_only_written_when_saved(site, tmp_path):
+    scraper(site, tmp_path).scrape_website()
+    assert scrape(site, tmp_path).site_changed
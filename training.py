@@ -0,0 +1,160 @@
+import contextlib
+import threading
+import time
+import uuid
+from model_store import save_model_file
+from logging_config import get_logger
+
+logger = get_logger('training')
+
+MODEL_FILE = 'website_training_data.model'
+# Held while /train scrapes and writes files, so prefork workers train one at a time
+TRAINING_LOCK_FILE = 'website_training_data.lock'
+
+# 'word' needs queries spell-corrected first; 'char' matches typos by their
+# shared character n-grams, so queries can be scored as typed
+VECTORIZER_MODES = {
+    'word': {'max_features': 1000, 'stop_words': 'english'},
+    'char': {'analyzer': 'char_wb', 'ngram_range': (2, 4), 'sublinear_tf': True}
+}
+
+
+def vectorizer_mode(vectorizer):
+    """The VECTORIZER_MODES key a fitted vectorizer was built with"""
+    return 'char' if vectorizer.analyzer == 'char_wb' else 'word'
+
+
+def build_model(training_data, vectorizer_mode='word'):
+    """Fit the TF-IDF model on the patterns of every intent"""
+    if vectorizer_mode not in VECTORIZER_MODES:
+        raise ValueError(f"Unknown vectorizer mode {vectorizer_mode!r}, expected one of {', '.join(VECTORIZER_MODES)}")
+
+    patterns = []
+    tags = []
+    responses_dict = {}
+
+    for intent in training_data['intents']:
+        tag = intent['tag']
+        responses_dict[tag] = intent['responses']
+
+        for pattern in intent['patterns']:
+            patterns.append(pattern.lower())
+            tags.append(tag)
+
+    # Only training needs scikit-learn; loaded models use TfidfQueryVectorizer
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizer = TfidfVectorizer(**VECTORIZER_MODES[vectorizer_mode])
+    tfidf_matrix = vectorizer.fit_transform(patterns)
+
+    return {
+        'vectorizer': vectorizer,
+        'patterns': patterns,
+        'tags': tags,
+        'responses': responses_dict,
+        'tfidf_matrix': tfidf_matrix
+    }
+
+
+def save_model(model_data, filename=MODEL_FILE):
+    """Write the model file; it is renamed into place once complete"""
+    save_model_file(model_data, filename)
+
+
+@contextlib.contextmanager
+def training_lock(filename=TRAINING_LOCK_FILE):
+    """Exclusive lock shared by every process training in this directory"""
+    try:
+        import fcntl
+    except ImportError:
+        # No fcntl (Windows): only the single-process dev server runs there
+        yield
+        return
+    with open(filename, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class TrainingConflict(Exception):
+    """A job with different options is already running; .job is that job"""
+    def __init__(self, job):
+        super().__init__(f"Training job {job.id} is already running with {job.options}")
+        self.job = job
+
+
+class TrainingJob:
+    """Progress of one background training run"""
+    def __init__(self, options=None):
+        self.id = uuid.uuid4().hex
+        self.options = options or {}
+        self.phase = 'queued'
+        self.started_at = time.time()
+        self.finished_at = None
+        self.error = None
+        self.result = None
+
+    def set_phase(self, phase):
+        logger.info("🛠️  Training %s: %s", self.id[:8], phase, extra={'job_id': self.id, 'phase': phase})
+        self.phase = phase
+
+    @property
+    def running(self):
+        return self.finished_at is None
+
+    def to_dict(self):
+        end = self.finished_at or time.time()
+        return {
+            'job_id': self.id,
+            'phase': self.phase,
+            'options': self.options,
+            'elapsed_seconds': round(end - self.started_at, 3),
+            'error': self.error,
+            'result': self.result
+        }
+
+
+class TrainingRunner:
+    """Runs train_func(job, **options) on a background thread, one job at a time"""
+    def __init__(self, train_func, history=20):
+        self.train_func = train_func
+        self.history = history
+        self.jobs = {}
+        self._active = None
+        self._lock = threading.Lock()
+
+    def start(self, **options):
+        """Start a new job, or return the one already running with the same options.
+
+        Raises TrainingConflict if the running job was started with other options.
+        """
+        with self._lock:
+            if self._active is not None and self._active.running:
+                if self._active.options != options:
+                    raise TrainingConflict(self._active)
+                return self._active
+
+            job = TrainingJob(options)
+            self._active = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                del self.jobs[next(iter(self.jobs))]
+
+        threading.Thread(target=self._run, args=(job, options),
+                         name=f'training-{job.id[:8]}', daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def _run(self, job, options):
+        try:
+            job.result = self.train_func(job, **options)
+            job.set_phase('done')
+        except Exception as e:
+            logger.exception("❌ Training failed: %s", e)
+            job.error = str(e)
+            job.set_phase('failed')
+        finally:
+            job.finished_at = time.time()
@@ -1,19 +1,126 @@
 import requests
 from bs4 import BeautifulSoup
+import hashlib
 import json
+import os
 import re
-from urllib.parse import urljoin
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from html_extractor import extract_stream
+
+# Crawled pages whose path contains one of the markers feed that section
+PAGE_SECTIONS = [
+    ('internship', ('intern',)),
+    ('courses', ('course', 'program', 'training')),
+    ('about', ('about',)),
+    ('contact', ('contact',))
+]
+SKIPPED_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css',
+    '.js', '.zip', '.mp4', '.mp3', '.doc', '.docx', '.xls', '.xlsx'
+}
+
+def write_json_atomically(filename, data, indent=2):
+    """Write data to a unique temp file next to filename, then rename it into place.
+
+    Readers never see a half-written file, and processes writing the same
+    file at once can't clobber each other's temp file.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
 
 class WebsiteScraper:
-    def __init__(self, base_url="https://www.brainovision.in"):
+    def __init__(self, base_url="https://www.brainovision.in", max_workers=5,
+                 per_host_limit=5, retries=3, backoff_factor=0.5,
+                 manifest_file='scrape_manifest.json', streaming=True, crawl=False,
+                 max_depth=2, max_pages=50, crawl_delay=1.0):
         self.base_url = base_url
+        self.streaming = streaming
+        self.crawl_mode = crawl
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.crawl_delay = crawl_delay
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
-    def scrape_website(self):
-        """Scrape all relevant pages from the website"""
+        # Bounded connection pool shared by all fetch threads, with retries
+        # and exponential backoff on connection errors and 429/5xx replies
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=['GET', 'HEAD'])
+        adapter = HTTPAdapter(pool_connections=per_host_limit, pool_maxsize=per_host_limit,
+                              pool_block=True, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # ETag / Last-Modified and extracted content of every page, so an
+        # unchanged site can be re-scraped without downloading or parsing it
+        self.manifest_file = manifest_file
+        self.manifest = self.load_manifest()
+        self.changed_urls = set()
+        self.site_changed = True
+        self._manifest_lock = threading.Lock()
+    
+    def _host_slot(self, url):
+        """Semaphore limiting concurrent requests to the host of url"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+    
+    def fetch(self, url, **kwargs):
+        """GET url through the shared session, respecting the per-host limit"""
+        kwargs.setdefault('timeout', 10)
+        with self._host_slot(url):
+            return self.session.get(url, **kwargs)
+        
+    def scrape_website(self, concurrent=True):
+        """Scrape all relevant pages from the website.
+
+        The manifest is not written here: callers save it once whatever they
+        build from the pages is safely on disk, so a failed build is retried.
+        """
+        self.changed_urls = set()
+        if self.crawl_mode:
+            website_data = self.crawl_website()
+        else:
+            website_data = self._scrape_known_pages(concurrent)
+        
+        self.site_changed = bool(self.changed_urls)
+        return website_data
+    
+    def _scrape_known_pages(self, concurrent):
+        """Scrape the homepage and the four well-known section pages"""
+        pages = {
+            'homepage': self.base_url,
+            'courses': f"{self.base_url}/courses",
+            'internship': f"{self.base_url}/internship",
+            'about': f"{self.base_url}/about",
+            'contact': f"{self.base_url}/contact"
+        }
         website_data = {
             'courses': [],
             'internship': [],
@@ -23,79 +130,294 @@ class WebsiteScraper:
         }
         
         try:
-            # Scrape homepage
-            homepage_content = self.scrape_page(self.base_url)
-            website_data['homepage'] = homepage_content
-            
-            # Scrape courses page
-            courses_content = self.scrape_page(f"{self.base_url}/courses")
-            website_data['courses'] = courses_content
-            
-            # Scrape internship page (if exists)
-            internship_content = self.scrape_page(f"{self.base_url}/internship")
-            website_data['internship'] = internship_content
-            
-            # Scrape about page
-            about_content = self.scrape_page(f"{self.base_url}/about")
-            website_data['about'] = about_content
-            
-            # Scrape contact page
-            contact_content = self.scrape_page(f"{self.base_url}/contact")
-            website_data['contact'] = contact_content
+            if concurrent:
+                # Fetch all pages at once; wall time is roughly the slowest page
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    contents = executor.map(self.scrape_page, pages.values())
+                    for key, content in zip(pages, contents):
+                        website_data[key] = content
+            else:
+                for key, url in pages.items():
+                    website_data[key] = self.scrape_page(url)
             
         except Exception as e:
             print(f"Error scraping website: {e}")
-            
+        
         return website_data
     
-    def scrape_page(self, url):
-        """Scrape content from a specific page"""
+    def crawl_website(self):
+        """Crawl the site and sort every page into the training data sections"""
+        website_data = {
+            'courses': [],
+            'internship': [],
+            'about': [],
+            'contact': [],
+            'homepage': [],
+            'pages': []
+        }
+        
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text content from important sections
-            content = []
+            # Pages are consumed as they are crawled; only the extracted
+            # records (or a small per-page intent) are kept
+            for url, content in self.crawl():
+                section = self._page_section(url)
+                if section:
+                    website_data[section].extend(content)
+                else:
+                    page_intent = self._page_intent(url, content)
+                    if page_intent:
+                        website_data['pages'].append(page_intent)
+        
+        except Exception as e:
+            print(f"Error crawling website: {e}")
+        
+        return website_data
+    
+    def crawl(self, max_depth=None, max_pages=None):
+        """Breadth-first crawl of same-site pages, yielding (url, content) per page"""
+        max_depth = self.max_depth if max_depth is None else max_depth
+        max_pages = self.max_pages if max_pages is None else max_pages
+        
+        start_url = self.normalize_url(self.base_url)
+        robots = self._load_robots(start_url)
+        user_agent = self.session.headers['User-Agent']
+        delay = max(self.crawl_delay, robots.crawl_delay(user_agent) or 0)
+        
+        queue = deque([(start_url, 0)])
+        seen = {start_url}
+        crawled = 0
+        
+        while queue and crawled < max_pages:
+            url, depth = queue.popleft()
+            if not robots.can_fetch(user_agent, url):
+                continue
             
-            # Get page title
-            title = soup.find('title')
-            if title:
-                content.append(f"Page Title: {title.get_text().strip()}")
+            # Be polite: pause between requests to the site
+            if crawled:
+                time.sleep(delay)
             
-            # Get headings
-            headings = soup.find_all(['h1', 'h2', 'h3'])
-            for heading in headings:
-                text = heading.get_text().strip()
-                if text and len(text) > 5:
-                    content.append(f"Heading: {text}")
+            content, links = self._scrape(url, collect_links=depth < max_depth)
+            crawled += 1
+            yield url, content
             
-            # Get paragraph content
-            paragraphs = soup.find_all('p')
-            for p in paragraphs:
-                text = p.get_text().strip()
-                if text and len(text) > 20:  # Only meaningful paragraphs
-                    content.append(text)
+            for link in links:
+                link = self.normalize_url(urljoin(url, link))
+                # The frontier never needs more URLs than the page budget
+                if link and link not in seen and self._same_site(link, start_url) \
+                        and len(seen) < max_pages:
+                    seen.add(link)
+                    queue.append((link, depth + 1))
+    
+    def normalize_url(self, url):
+        """Canonical form of url for deduplication, or None if it isn't a crawlable page"""
+        parts = urlsplit(url.strip())
+        if parts.scheme not in ('http', 'https'):
+            return None
+        
+        path = parts.path or '/'
+        if path != '/':
+            path = path.rstrip('/')
+        if os.path.splitext(path)[1].lower() in SKIPPED_EXTENSIONS:
+            return None
+        
+        netloc = parts.netloc.lower()
+        default_port = ':443' if parts.scheme == 'https' else ':80'
+        if netloc.endswith(default_port):
+            netloc = netloc[:-len(default_port)]
+        
+        return urlunsplit((parts.scheme, netloc, path, parts.query, ''))
+    
+    def _same_site(self, url, start_url):
+        host = urlsplit(url).netloc
+        start_host = urlsplit(start_url).netloc
+        return host.removeprefix('www.') == start_host.removeprefix('www.')
+    
+    def _load_robots(self, start_url):
+        """Fetch and parse robots.txt; a missing or unreachable file allows everything"""
+        parts = urlsplit(start_url)
+        robots = RobotFileParser(f"{parts.scheme}://{parts.netloc}/robots.txt")
+        try:
+            response = self.fetch(robots.url)
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code == 200:
+                robots.parse(response.text.splitlines())
+            else:
+                robots.allow_all = True
+        except Exception as e:
+            print(f"Error reading {robots.url}: {e}")
+            robots.allow_all = True
+        return robots
+    
+    def _page_section(self, url):
+        """Training data section a crawled page belongs to, if any"""
+        path = urlsplit(url).path.lower()
+        if path == '/':
+            return 'homepage'
+        for section, markers in PAGE_SECTIONS:
+            if any(marker in path for marker in markers):
+                return section
+        return None
+    
+    def _page_intent(self, url, content):
+        """Build an intent answering questions about one crawled page"""
+        title = None
+        headings = []
+        paragraphs = []
+        for record in content:
+            if record.startswith("Page Title: "):
+                title = record[len("Page Title: "):]
+            elif record.startswith("Heading: "):
+                headings.append(record[len("Heading: "):])
+            elif not record.startswith("• "):
+                paragraphs.append(record)
+        
+        patterns = []
+        for text in [title] + headings:
+            if text and text.lower() not in patterns:
+                patterns.append(text.lower())
+        if not patterns:
+            return None
+        
+        summary = paragraphs[0] if paragraphs else f"You can read about {patterns[0]} on our website."
+        slug = re.sub(r'[^a-z0-9]+', '_', urlsplit(url).path.lower()).strip('_')
+        return {
+            "tag": f"page_{slug}",
+            "patterns": patterns[:10],
+            "responses": [f"{summary}\n\n🔗 **Read more:** {url}"]
+        }
+    
+    def scrape_page(self, url):
+        """Scrape content from a specific page"""
+        return self._scrape(url)[0]
+    
+    def _scrape(self, url, collect_links=False):
+        """Scrape url, returning its content records and (optionally) its links"""
+        previous = self.manifest.get(url)
+        # A 304 can only stand in for the links if they were stored last time
+        conditional = previous and not (collect_links and previous.get('links') is None)
+        try:
+            # Ask the server to skip the body if the page hasn't changed
+            headers = {}
+            if conditional and previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if conditional and previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
             
-            # Get list items
-            lists = soup.find_all(['ul', 'ol'])
-            for lst in lists:
-                items = lst.find_all('li')
-                for item in items:
-                    text = item.get_text().strip()
-                    if text and len(text) > 10:
-                        content.append(f"• {text}")
+            links = [] if collect_links else None
+            with self.fetch(url, headers=headers, stream=self.streaming) as response:
+                if response.status_code == 304 and previous:
+                    return list(previous['content']), list(previous.get('links') or [])
+                response.raise_for_status()
+                
+                if self.streaming:
+                    # Parse chunks as they arrive instead of building a tree
+                    content = extract_stream(response.iter_content(chunk_size=65536),
+                                             self._declared_encoding(response), links)
+                else:
+                    content = self.extract_content(response.content)
+                    if collect_links:
+                        links = self._extract_links(response.content)
             
-            return content
+            self._record_page(url, response, content, links)
+            return content, links or []
             
         except Exception as e:
             print(f"Error scraping {url}: {e}")
-            return []
+            # Keep the last good copy of a page that fetched fine before
+            if previous and 'error' not in previous:
+                return list(previous['content']), list(previous.get('links') or [])
+            status = getattr(getattr(e, 'response', None), 'status_code', None) or type(e).__name__
+            self._record_failure(url, status)
+            return [], []
+    
+    def _declared_encoding(self, response):
+        """Charset from the Content-Type header, defaulting to UTF-8"""
+        if 'charset' in response.headers.get('Content-Type', '').lower():
+            return response.encoding
+        return 'utf-8'
+    
+    def _record_page(self, url, response, content, links=None):
+        """Update the manifest entry for url and note whether its content changed"""
+        content_hash = hashlib.sha256(json.dumps(content).encode('utf-8')).hexdigest()
+        with self._manifest_lock:
+            previous = self.manifest.get(url)
+            if previous is None or previous.get('content_hash') != content_hash:
+                self.changed_urls.add(url)
+            self.manifest[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_hash': content_hash,
+                'content': content,
+                # None when links were not collected, so a crawl re-fetches the page
+                'links': links
+            }
+    
+    def _record_failure(self, url, status):
+        """Remember that url failed with status (HTTP code or error name); only a new status counts as a change"""
+        with self._manifest_lock:
+            previous = self.manifest.get(url)
+            if previous is None or previous.get('error') != status:
+                self.changed_urls.add(url)
+            self.manifest[url] = {'error': status, 'content': [], 'links': None}
+    
+    def load_manifest(self):
+        """Load the per-URL validators and extracted content from the last scrape"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_manifest(self):
+        """Write the manifest via a temp file so a crash never leaves it half-written"""
+        write_json_atomically(self.manifest_file, self.manifest)
+    
+    def _extract_links(self, html):
+        """href of every link on a page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        return [a['href'] for a in soup.find_all('a', href=True)]
+    
+    def extract_content(self, html):
+        """Extract title, heading, paragraph and list item text from a page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Get text content from important sections
+        content = []
+        
+        # Get page title
+        title = soup.find('title')
+        if title:
+            content.append(f"Page Title: {title.get_text().strip()}")
+        
+        # Get headings
+        headings = soup.find_all(['h1', 'h2', 'h3'])
+        for heading in headings:
+            text = heading.get_text().strip()
+            if text and len(text) > 5:
+                content.append(f"Heading: {text}")
+        
+        # Get paragraph content
+        paragraphs = soup.find_all('p')
+        for p in paragraphs:
+            text = p.get_text().strip()
+            if text and len(text) > 20:  # Only meaningful paragraphs
+                content.append(text)
+        
+        # Get list items
+        lists = soup.find_all(['ul', 'ol'])
+        for lst in lists:
+            items = lst.find_all('li')
+            for item in items:
+                text = item.get_text().strip()
+                if text and len(text) > 10:
+                    content.append(f"• {text}")
+        
+        return content
     
     def generate_training_data(self, website_data):
         """Generate training data from scraped website content with misspellings"""
@@ -301,6 +623,9 @@ class WebsiteScraper:
                 "responses": data_science_responses
             })
         
+        # One intent per crawled page outside the known sections
+        intents.extend(website_data.get('pages', []))
+        
         # Add default intents with misspellings
         intents.extend(self._get_default_intents())
         
@@ -486,17 +811,22 @@ class WebsiteScraper:
             }
         ]
     
-    def save_training_data(self, filename='website_training_data.json'):
+    def save_training_data(self, filename='website_training_data.json', force=False):
         """Scrape website and save training data"""
         print("🕸️  Scraping Brainovision Solutions website...")
         website_data = self.scrape_website()
         print("✅ Website scraping completed!")
         
+        # Nothing changed since the last scrape: keep the existing training data
+        if not self.site_changed and not force and os.path.exists(filename):
+            print(f"♻️  Website unchanged, reusing {filename}")
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
         print("📝 Generating training data with misspellings...")
         training_data = self.generate_training_data(website_data)
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(training_data, f, indent=2)
+        write_json_atomically(filename, training_data)
         
         print(f"✅ Training data saved to {filename}")
         print(f"📊 Generated {len(training_data['intents'])} intents")
@@ -505,5 +835,6 @@ class WebsiteScraper:
         return training_data
 
 if __name__ == "__main__":
-    scraper = WebsiteScraper()
-    training_data = scraper.save_training_data()
\ No newline at end of file
+    scraper = WebsiteScraper(crawl='--crawl' in sys.argv)
+    training_data = scraper.save_training_data()
+    scraper.save_manifest()
\ No newline at end of file